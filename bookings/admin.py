@@ -1,4 +1,5 @@
 from django.contrib import admin
+from .export import export_response
 from .models import Booking, PriceSetting
 
 
@@ -36,6 +37,7 @@ class BookingAdmin(admin.ModelAdmin):
     list_editable = ['status']
     readonly_fields = ['total_nights', 'total_price', 'created_at', 'updated_at']
     date_hierarchy = 'check_in'
+    actions = ['export_csv', 'export_jsonl']
     
     fieldsets = (
         ('Land Information', {
@@ -63,4 +65,13 @@ class BookingAdmin(admin.ModelAdmin):
         """Optimize queries"""
         qs = super().get_queryset(request)
         return qs.select_related('land')
-
+    
+    @admin.action(description='Export selected bookings as CSV')
+    def export_csv(self, request, queryset):
+        """Stream the selected bookings as CSV; filter the list first to export by status or dates"""
+        return export_response(queryset, 'csv')
+    
+    @admin.action(description='Export selected bookings as JSON Lines')
+    def export_jsonl(self, request, queryset):
+        """Stream the selected bookings as JSON Lines"""
+        return export_response(queryset, 'jsonl')
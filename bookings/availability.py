@@ -0,0 +1,280 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db.models import Count, Exists, FilteredRelation, Max, OuterRef, Q
+from django.utils import timezone
+from lands.models import Land
+from .models import Booking, BookingHold
+from .occupancy_index import get_occupancy_index
+
+
+# Booking statuses that hold a plot for their dates
+ACTIVE_STATUSES = ['pending', 'confirmed']
+
+
+def overlapping_bookings(check_in, check_out, statuses=None):
+    """Bookings that occupy at least one night in [check_in, check_out)"""
+    return Booking.objects.filter(
+        status__in=statuses or ACTIVE_STATUSES,
+        check_in__lt=check_out,
+        check_out__gt=check_in
+    )
+
+
+def active_holds(check_in, check_out, exclude_holder=None):
+    """Unexpired holds that overlap the night range [check_in, check_out)"""
+    holds = BookingHold.objects.filter(
+        expires_at__gt=timezone.now(),
+        check_in__lt=check_out,
+        check_out__gt=check_in
+    )
+    if exclude_holder:
+        holds = holds.exclude(holder=exclude_holder)
+    return holds
+
+
+def annotate_availability(lands, check_in, check_out, holder=None):
+    """Annotate a Land queryset with is_booked and is_held for the given dates"""
+    overlap = overlapping_bookings(check_in, check_out).filter(land=OuterRef('pk'))
+    held = active_holds(check_in, check_out, exclude_holder=holder).filter(land=OuterRef('pk'))
+    return lands.annotate(is_booked=Exists(overlap), is_held=Exists(held))
+
+
+def split_lands_by_availability(check_in, check_out, lands=None, holder=None):
+    """
+    Return (available_lands, booked_lands) for the given dates.
+
+    Plots held by another guest count as booked and carry is_held=True.
+    Uses the in-process occupancy index when it is enabled and covers the
+    dates; otherwise runs a single query with one overlap subquery per plot.
+    """
+    if lands is None:
+        lands = Land.objects.filter(status='available')
+
+    index = get_occupancy_index()
+    if index is not None and index.covers(check_in, check_out):
+        held_ids = set(
+            active_holds(check_in, check_out, exclude_holder=holder).values_list('land_id', flat=True)
+        )
+        lands = list(lands)
+        for land in lands:
+            land.is_booked = index.is_booked(land.pk, check_in, check_out)
+            land.is_held = land.pk in held_ids
+    else:
+        lands = annotate_availability(lands, check_in, check_out, holder=holder)
+
+    available_lands = []
+    booked_lands = []
+    for land in lands:
+        if land.is_booked or land.is_held:
+            booked_lands.append(land)
+        else:
+            available_lands.append(land)
+    return available_lands, booked_lands
+
+
+def is_land_available(land, check_in, check_out):
+    """Check if a single land has no active booking for the given dates"""
+    index = get_occupancy_index()
+    if index is not None and index.covers(check_in, check_out):
+        return not index.is_booked(land.pk, check_in, check_out)
+    return not overlapping_bookings(check_in, check_out).filter(land=land).exists()
+
+
+def is_land_held(land, check_in, check_out, holder=None):
+    """Check if another guest holds the land for any of the given nights"""
+    return active_holds(check_in, check_out, exclude_holder=holder).filter(land=land).exists()
+
+
+def availability_stamp(check_in, check_out, land_id=None, include_holds=True):
+    """
+    Cheap version stamp of the data behind availability for the dates.
+
+    Combines the latest update time and row count of the lands and of the
+    bookings (and optionally holds) overlapping the range, so any create,
+    edit or delete changes it. Optionally scoped to a single land.
+    """
+    sources = [
+        (Land.objects.all(), 'updated_at'),
+        (Booking.objects.filter(check_in__lt=check_out, check_out__gt=check_in), 'updated_at'),
+    ]
+    if include_holds:
+        sources.append((active_holds(check_in, check_out), 'created_at'))
+
+    stamp = []
+    for queryset, field in sources:
+        if land_id is not None:
+            queryset = queryset.filter(pk=land_id) if queryset.model is Land else queryset.filter(land_id=land_id)
+        values = queryset.order_by().aggregate(latest=Max(field), count=Count('pk'))
+        stamp += [values['latest'], values['count']]
+    return stamp
+
+
+def occupied_nights(intervals, start, end):
+    """
+    Mark the nights in [start, end) covered by (check_in, check_out) intervals.
+
+    Returns a bytearray with one entry per night, 1 where booked. Each
+    interval is clipped to the range and set with a single slice assignment.
+    """
+    occupied = bytearray((end - start).days)
+    for check_in, check_out in intervals:
+        first = max((check_in - start).days, 0)
+        last = min((check_out - start).days, len(occupied))
+        if first < last:
+            occupied[first:last] = b'\x01' * (last - first)
+    return occupied
+
+
+def _free_start_dates(intervals, window_start, window_end, nights):
+    """
+    Start dates of every free run of `nights` nights inside the window.
+
+    `intervals` are (check_in, check_out) pairs sorted by check_in.
+    """
+    stay = timedelta(days=nights)
+    starts = []
+    cursor = window_start
+
+    for check_in, check_out in list(intervals) + [(window_end, window_end)]:
+        gap_end = min(check_in, window_end)
+        day = cursor
+        while day + stay <= gap_end:
+            starts.append(day)
+            day += timedelta(days=1)
+        cursor = max(cursor, check_out)
+        if cursor >= window_end:
+            break
+    return starts
+
+
+def find_flexible_availability(window_start, window_end, nights, capacity=None, holder=None):
+    """
+    Find every start date for a stay of `nights` nights inside the window.
+
+    Returns a list of (land, start_dates) for available lands, computed in one
+    pass over each land's sorted booking intervals. Nights held by another
+    guest than `holder` are taken, as in split_lands_by_availability. Runs
+    three queries in total.
+    """
+    lands = Land.objects.filter(status='available')
+    if capacity:
+        lands = lands.filter(capacity__gte=capacity)
+
+    intervals = defaultdict(list)
+    bookings = overlapping_bookings(window_start, window_end).filter(land__in=lands)
+    holds = active_holds(window_start, window_end, exclude_holder=holder).filter(land__in=lands)
+    for queryset in (bookings, holds):
+        rows = queryset.order_by().values_list('land_id', 'check_in', 'check_out')
+        for land_id, check_in, check_out in rows:
+            intervals[land_id].append((check_in, check_out))
+
+    return [
+        (land, _free_start_dates(sorted(intervals[land.pk]), window_start, window_end, nights))
+        for land in lands
+    ]
+
+
+# Cell states of the park-wide occupancy grid, indexed by cell code
+GRID_STATES = ['free', 'pending', 'confirmed', 'maintenance', 'unavailable']
+GRID_FREE, GRID_PENDING, GRID_CONFIRMED, GRID_MAINTENANCE, GRID_UNAVAILABLE = range(len(GRID_STATES))
+
+_GRID_CELL_CHARS = bytes.maketrans(bytes(range(len(GRID_STATES))), b'01234')
+
+
+class OccupancyGrid:
+    """
+    Plots x days occupancy matrix over [start, end).
+
+    Cells are stored row-major in a single bytearray holding one state code
+    per plot per night.
+    """
+
+    def __init__(self, start, end, lands):
+        self.start = start
+        self.end = end
+        self.days = (end - start).days
+        self.lands = lands
+        self.cells = bytearray(len(lands) * self.days)
+
+    def row(self, index):
+        """State codes of one plot, one byte per night"""
+        offset = index * self.days
+        return self.cells[offset:offset + self.days]
+
+    def fill(self, index, first, last, code):
+        """Set nights [first, last) of one plot to a state code"""
+        offset = index * self.days
+        self.cells[offset + first:offset + last] = bytes([code]) * (last - first)
+
+    def dates(self):
+        """Dates of the grid columns"""
+        return [self.start + timedelta(days=i) for i in range(self.days)]
+
+    def as_dict(self):
+        """JSON-serialisable form, one digit string per plot"""
+        return {
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'days': self.days,
+            'states': GRID_STATES,
+            'plots': [
+                {
+                    'id': land['id'],
+                    'name': land['name'],
+                    'status': land['status'],
+                    'cells': self.row(index).translate(_GRID_CELL_CHARS).decode('ascii'),
+                }
+                for index, land in enumerate(self.lands)
+            ],
+        }
+
+
+def build_occupancy_grid(start, end):
+    """
+    Build the park-wide occupancy grid for nights in [start, end).
+
+    Lands and their overlapping active bookings come from one LEFT JOIN query.
+    Confirmed nights take precedence over pending ones.
+    """
+    rows = Land.objects.annotate(
+        active_booking=FilteredRelation(
+            'bookings',
+            condition=Q(
+                bookings__status__in=ACTIVE_STATUSES,
+                bookings__check_in__lt=end,
+                bookings__check_out__gt=start,
+            ),
+        )
+    ).order_by('name', 'id').values_list(
+        'id', 'name', 'status',
+        'active_booking__status', 'active_booking__check_in', 'active_booking__check_out',
+    )
+
+    lands = []
+    positions = {}
+    intervals = {GRID_PENDING: [], GRID_CONFIRMED: []}
+    for land_id, name, land_status, booking_status, check_in, check_out in rows:
+        if land_id not in positions:
+            positions[land_id] = len(lands)
+            lands.append({'id': land_id, 'name': name, 'status': land_status})
+        if booking_status:
+            code = GRID_CONFIRMED if booking_status == 'confirmed' else GRID_PENDING
+            intervals[code].append((positions[land_id], check_in, check_out))
+
+    grid = OccupancyGrid(start, end, lands)
+    for index, land in enumerate(lands):
+        if land['status'] == 'maintenance':
+            grid.fill(index, 0, grid.days, GRID_MAINTENANCE)
+        elif land['status'] != 'available':
+            grid.fill(index, 0, grid.days, GRID_UNAVAILABLE)
+
+    for code in (GRID_PENDING, GRID_CONFIRMED):
+        for index, check_in, check_out in intervals[code]:
+            if lands[index]['status'] != 'available':
+                continue
+            first = max((check_in - start).days, 0)
+            last = min((check_out - start).days, grid.days)
+            if first < last:
+                grid.fill(index, first, last, code)
+
+    return grid
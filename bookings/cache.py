@@ -0,0 +1,81 @@
+"""
+Versioned response cache for search results.
+
+Rendered search pages are cached per (check_in, check_out) under the current
+availability version (bumped by Booking/Land signals) and holds version
+(bumped when holds are placed or released), so a cached page is never served
+after a change to the data it was built from. Expired holds do not bump the
+version; SEARCH_CACHE_SECONDS bounds how long they can linger on a cached page.
+The key is taken before availability is queried, so a page built while a
+booking commits is stored under the old version and never served after it.
+Pages read from the replica are served from the cache but never stored, as
+the replica may lag behind the version in the key.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .occupancy_index import get_availability_version
+
+
+HOLDS_VERSION_KEY = 'bookings:holds_version'
+SEARCH_HITS_KEY = 'bookings:search_cache:hits'
+SEARCH_MISSES_KEY = 'bookings:search_cache:misses'
+
+
+def _increment(key):
+    """Increment a shared counter, creating it if needed"""
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def bump_holds_version():
+    """Record a change to booking holds"""
+    return _increment(HOLDS_VERSION_KEY)
+
+
+def search_cache_timeout():
+    """Seconds a rendered search page stays cached; 0 disables the cache"""
+    return getattr(settings, 'SEARCH_CACHE_SECONDS', 60)
+
+
+def search_versions():
+    """The availability and holds versions search pages are cached under"""
+    return get_availability_version(), cache.get(HOLDS_VERSION_KEY, 0)
+
+
+def search_cache_key(check_in, check_out):
+    """Cache key for a search, tied to today's date and the current versions"""
+    return 'bookings:search:{}:{}:{}:{}:{}'.format(
+        timezone.now().date().isoformat(),
+        check_in.isoformat(),
+        check_out.isoformat(),
+        *search_versions(),
+    )
+
+
+def get_cached_search(key):
+    """Get the cached page content for a search key, counting hits and misses"""
+    content = cache.get(key)
+    _increment(SEARCH_HITS_KEY if content is not None else SEARCH_MISSES_KEY)
+    return content
+
+
+def set_cached_search(key, content):
+    """Store the rendered page content under the key taken before it was built"""
+    cache.set(key, content, search_cache_timeout())
+
+
+def search_cache_stats():
+    """Hit and miss counters of the search cache"""
+    hits = cache.get(SEARCH_HITS_KEY, 0)
+    misses = cache.get(SEARCH_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0,
+    }
@@ -0,0 +1,53 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from bookings.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_lines, filter_bookings
+from bookings.models import Booking
+
+
+class Command(BaseCommand):
+    help = 'Stream bookings as CSV or JSON Lines, optionally filtered by status and date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', dest='export_format')
+        parser.add_argument(
+            '--status', action='append', choices=[code for code, _ in Booking.STATUS_CHOICES],
+            help='Only export bookings with this status (repeatable)'
+        )
+        parser.add_argument('--start', help='First date to export (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Day after the last date to export (YYYY-MM-DD)')
+        parser.add_argument(
+            '--date-field', choices=['check_in', 'check_out', 'created_at'], default='check_in',
+            help='Date the --start/--end range applies to'
+        )
+        parser.add_argument('--output', help='File to write to (default: standard output)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+
+        bookings = filter_bookings(
+            statuses=options['status'],
+            start=start,
+            end=end,
+            date_field=options['date_field']
+        )
+        lines = export_lines(bookings, options['export_format'], chunk_size=options['chunk_size'])
+
+        if options['output']:
+            count = 0
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                for line in lines:
+                    output.write(line)
+                    count += 1
+            if options['export_format'] == 'csv':
+                count -= 1
+            self.stderr.write(self.style.SUCCESS(f'✓ Exported {count} bookings to {options["output"]}'))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
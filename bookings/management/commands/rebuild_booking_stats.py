@@ -0,0 +1,31 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from bookings.rollups import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily booking statistics rollups from the bookings table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First creation date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Day after the last creation date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--batch-days', type=int, default=31, help='Days rebuilt per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format.')
+        if start and end and start >= end:
+            raise CommandError('--start must be before --end.')
+        if options['batch_days'] < 1:
+            raise CommandError('--batch-days must be at least 1.')
+
+        days = rebuild_stats(
+            start=start,
+            end=end,
+            batch_days=options['batch_days'],
+            log=self.stdout.write
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt booking statistics for {days} days'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('lands', '0002_land_price_per_night'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['land', 'status', 'check_in', 'check_out'], name='booking_land_status_dates_idx'),
+        ),
+    ]
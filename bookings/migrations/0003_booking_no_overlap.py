@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+CREATE_CONSTRAINT = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+ALTER TABLE bookings_booking
+    ADD CONSTRAINT booking_no_overlap
+    EXCLUDE USING gist (
+        land_id WITH =,
+        daterange(check_in, check_out, '[)') WITH &&
+    )
+    WHERE (status IN ('pending', 'confirmed'));
+"""
+
+DROP_CONSTRAINT = """
+ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS booking_no_overlap;
+"""
+
+
+def add_exclusion_constraint(apps, schema_editor):
+    """Forbid overlapping active bookings per land (PostgreSQL only)"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_CONSTRAINT)
+
+
+def remove_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_booking_land_status_dates_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_exclusion_constraint, remove_exclusion_constraint),
+    ]
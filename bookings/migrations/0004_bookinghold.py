@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_no_overlap'),
+        ('lands', '0002_land_price_per_night'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('check_in', models.DateField()),
+                ('check_out', models.DateField()),
+                ('holder', models.CharField(help_text='Session key of the guest holding the plot', max_length=40)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('land', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='lands.land')),
+            ],
+            options={
+                'verbose_name': 'Booking Hold',
+                'verbose_name_plural': 'Booking Holds',
+                'indexes': [models.Index(fields=['land', 'check_in', 'check_out', 'expires_at'], name='hold_land_dates_idx')],
+            },
+        ),
+    ]
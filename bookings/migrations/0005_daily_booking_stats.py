@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_bookinghold'),
+        ('lands', '0002_land_price_per_night'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bookings_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('total_nights', models.PositiveIntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, help_text='Sum of booking totals in any status', max_digits=14)),
+                ('revenue_bookings', models.PositiveIntegerField(default=0, help_text='Number of confirmed or completed bookings')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Sum of confirmed and completed booking totals', max_digits=14)),
+                ('date', models.DateField(unique=True)),
+            ],
+            options={
+                'verbose_name': 'Daily Booking Stats',
+                'verbose_name_plural': 'Daily Booking Stats',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LandDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bookings_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('total_nights', models.PositiveIntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, help_text='Sum of booking totals in any status', max_digits=14)),
+                ('revenue_bookings', models.PositiveIntegerField(default=0, help_text='Number of confirmed or completed bookings')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Sum of confirmed and completed booking totals', max_digits=14)),
+                ('date', models.DateField()),
+                ('land', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='lands.land')),
+            ],
+            options={
+                'verbose_name': 'Land Daily Stats',
+                'verbose_name_plural': 'Land Daily Stats',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('land', 'date'), name='land_daily_stats_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+# Frozen copies of the rollup definitions in bookings.rollups as of this migration
+REVENUE_STATUSES = ['confirmed', 'completed']
+STATUS_COUNTERS = {
+    'pending': 'pending_count',
+    'confirmed': 'confirmed_count',
+    'cancelled': 'cancelled_count',
+    'completed': 'completed_count',
+}
+STATS_FIELDS = [
+    'bookings_count', 'pending_count', 'confirmed_count', 'cancelled_count',
+    'completed_count', 'total_nights', 'total_value', 'revenue_bookings', 'revenue',
+]
+
+
+def backfill_stats(apps, schema_editor):
+    """Fill the rollups from the bookings that existed before them"""
+    # The booking signals keep the rollups current from here on
+    Booking = apps.get_model('bookings', 'Booking')
+    DailyBookingStats = apps.get_model('bookings', 'DailyBookingStats')
+    LandDailyStats = apps.get_model('bookings', 'LandDailyStats')
+
+    revenue = Q(status__in=REVENUE_STATUSES)
+    aggregates = {
+        'bookings_count': Count('id'),
+        'total_nights': Sum('total_nights'),
+        'total_value': Sum('total_price'),
+        'revenue_bookings': Count('id', filter=revenue),
+        'revenue': Sum('total_price', filter=revenue),
+    }
+    for status, field in STATUS_COUNTERS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+    rows = Booking.objects.annotate(day=TruncDate('created_at')).order_by().values('day', 'land_id').annotate(
+        **aggregates
+    )
+
+    daily = {}
+    land_rows = []
+    for row in rows.iterator(chunk_size=2000):
+        values = {field: row[field] or 0 for field in STATS_FIELDS}
+        land_rows.append(LandDailyStats(land_id=row['land_id'], date=row['day'], **values))
+        totals = daily.setdefault(row['day'], {field: 0 for field in STATS_FIELDS})
+        for field in STATS_FIELDS:
+            totals[field] += values[field]
+
+    DailyBookingStats.objects.all().delete()
+    LandDailyStats.objects.all().delete()
+    DailyBookingStats.objects.bulk_create(
+        [DailyBookingStats(date=day, **values) for day, values in daily.items()], batch_size=1000
+    )
+    LandDailyStats.objects.bulk_create(land_rows, batch_size=1000)
+
+
+def clear_stats(apps, schema_editor):
+    """Empty the rollups again"""
+    apps.get_model('bookings', 'DailyBookingStats').objects.all().delete()
+    apps.get_model('bookings', 'LandDailyStats').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_daily_booking_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_stats, clear_stats),
+    ]
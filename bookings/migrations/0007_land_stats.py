@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+# Counter fields as of this migration
+STATS_FIELDS = [
+    'bookings_count', 'pending_count', 'confirmed_count', 'cancelled_count',
+    'completed_count', 'total_nights', 'total_value', 'revenue_bookings', 'revenue',
+]
+
+
+def backfill_land_stats(apps, schema_editor):
+    """Sum the per-land daily rollups into the running totals"""
+    LandDailyStats = apps.get_model('bookings', 'LandDailyStats')
+    LandStats = apps.get_model('bookings', 'LandStats')
+    rows = LandDailyStats.objects.order_by().values('land_id').annotate(
+        **{f'sum_{field}': Sum(field) for field in STATS_FIELDS}
+    )
+    LandStats.objects.bulk_create([
+        LandStats(land_id=row['land_id'], **{field: row[f'sum_{field}'] or 0 for field in STATS_FIELDS})
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_backfill_booking_stats'),
+        ('lands', '0002_land_price_per_night'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LandStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bookings_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('cancelled_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('total_nights', models.PositiveIntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, help_text='Sum of booking totals in any status', max_digits=14)),
+                ('revenue_bookings', models.PositiveIntegerField(default=0, help_text='Number of confirmed or completed bookings')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Sum of confirmed and completed booking totals', max_digits=14)),
+                ('land', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='lands.land')),
+            ],
+            options={
+                'verbose_name': 'Land Stats',
+                'verbose_name_plural': 'Land Stats',
+            },
+        ),
+        migrations.RunPython(backfill_land_stats, migrations.RunPython.noop),
+    ]
@@ -98,16 +98,26 @@ class Booking(models.Model):
         verbose_name = "Booking"
         verbose_name_plural = "Bookings"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['land', 'status', 'check_in', 'check_out'],
+                name='booking_land_status_dates_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.guest_name} - {self.land.name} ({self.check_in} to {self.check_out})"
     
-    def save(self, *args, **kwargs):
-        """Calculate total nights and price before saving"""
+    def calculate_totals(self):
+        """Calculate total nights and price from the dates"""
         if self.check_in and self.check_out:
             delta = self.check_out - self.check_in
             self.total_nights = delta.days
             self.total_price = self.price_per_night * self.total_nights
+    
+    def save(self, *args, **kwargs):
+        """Calculate total nights and price before saving"""
+        self.calculate_totals()
         super().save(*args, **kwargs)
     
     def clean(self):
@@ -127,3 +137,112 @@ class Booking(models.Model):
                     f"Number of guests ({self.number_of_guests}) exceeds land capacity ({self.land.capacity})"
                 )
 
+
+
+class BookingHold(models.Model):
+    """Short-lived hold on a land while a guest completes the booking form"""
+    land = models.ForeignKey(
+        Land,
+        on_delete=models.CASCADE,
+        related_name='holds'
+    )
+    check_in = models.DateField()
+    check_out = models.DateField()
+    holder = models.CharField(
+        max_length=40,
+        help_text="Session key of the guest holding the plot"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Booking Hold"
+        verbose_name_plural = "Booking Holds"
+        indexes = [
+            models.Index(
+                fields=['land', 'check_in', 'check_out', 'expires_at'],
+                name='hold_land_dates_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Hold on {self.land_id} ({self.check_in} to {self.check_out}) until {self.expires_at}"
+
+
+class BookingStatsFields(models.Model):
+    """Counters shared by the daily booking statistics rollups"""
+    bookings_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    confirmed_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    total_nights = models.PositiveIntegerField(default=0)
+    total_value = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Sum of booking totals in any status"
+    )
+    revenue_bookings = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of confirmed or completed bookings"
+    )
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Sum of confirmed and completed booking totals"
+    )
+    
+    class Meta:
+        abstract = True
+
+
+class DailyBookingStats(BookingStatsFields):
+    """Bookings created per day, maintained incrementally from Booking signals"""
+    date = models.DateField(unique=True)
+    
+    class Meta:
+        verbose_name = "Daily Booking Stats"
+        verbose_name_plural = "Daily Booking Stats"
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"{self.date}: {self.bookings_count} bookings"
+
+
+class LandDailyStats(BookingStatsFields):
+    """Bookings created per land per day"""
+    land = models.ForeignKey(
+        Land,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+    
+    class Meta:
+        verbose_name = "Land Daily Stats"
+        verbose_name_plural = "Land Daily Stats"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['land', 'date'], name='land_daily_stats_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.land_id} {self.date}: {self.bookings_count} bookings"
+
+
+class LandStats(BookingStatsFields):
+    """Running totals of all bookings per land, so rankings do not scan the daily rows"""
+    land = models.OneToOneField(
+        Land,
+        on_delete=models.CASCADE,
+        related_name='stats'
+    )
+    
+    class Meta:
+        verbose_name = "Land Stats"
+        verbose_name_plural = "Land Stats"
+    
+    def __str__(self):
+        return f"{self.land_id}: {self.bookings_count} bookings"
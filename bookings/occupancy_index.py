@@ -0,0 +1,156 @@
+"""
+In-process occupancy index.
+
+Holds one day-bitmap per Land over a rolling horizon so overlap checks can be
+answered with a single bitwise AND instead of a database round trip. Bit ``n``
+of a land's bitmap is set when the night starting ``origin + n days`` is held
+by an active booking.
+
+The index is built lazily and kept current through the signals in
+``bookings.signals``. Every change bumps a shared availability version in the
+default cache; a worker whose copy carries an older version rebuilds it on the
+next lookup. Use a cache backend shared by all workers (file-based, Redis,
+memcached) when running more than one gunicorn worker.
+"""
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+AVAILABILITY_VERSION_KEY = 'bookings:availability_version'
+
+# Number of days covered by the index, starting today
+HORIZON_DAYS = 730
+
+_lock = threading.Lock()
+_index = None
+
+
+def get_availability_version():
+    """Get the shared availability version"""
+    return cache.get(AVAILABILITY_VERSION_KEY, 0)
+
+
+def bump_availability_version():
+    """Increment the shared availability version and return the new value"""
+    cache.add(AVAILABILITY_VERSION_KEY, 0, timeout=None)
+    try:
+        return cache.incr(AVAILABILITY_VERSION_KEY)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(AVAILABILITY_VERSION_KEY, 1, timeout=None)
+        return 1
+
+
+class OccupancyIndex:
+    """Per-land night bitmaps over [origin, origin + horizon_days)"""
+
+    def __init__(self, origin, horizon_days=HORIZON_DAYS, version=0):
+        self.origin = origin
+        self.horizon_days = horizon_days
+        self.end = origin + timedelta(days=horizon_days)
+        self.version = version
+        self.bitmaps = {}
+
+    def covers(self, check_in, check_out):
+        """Check if the night range lies inside the indexed horizon"""
+        return self.origin <= check_in and check_out <= self.end
+
+    def _range_mask(self, check_in, check_out):
+        start = max((check_in - self.origin).days, 0)
+        stop = min((check_out - self.origin).days, self.horizon_days)
+        if stop <= start:
+            return 0
+        return ((1 << (stop - start)) - 1) << start
+
+    def mark(self, land_id, check_in, check_out):
+        """Set the nights of a booking on a land's bitmap"""
+        mask = self._range_mask(check_in, check_out)
+        self.bitmaps[land_id] = self.bitmaps.get(land_id, 0) | mask
+
+    def is_booked(self, land_id, check_in, check_out):
+        """Check if any night in [check_in, check_out) is held on the land"""
+        return bool(self.bitmaps.get(land_id, 0) & self._range_mask(check_in, check_out))
+
+    def load(self, land_ids=None):
+        """
+        (Re)build bitmaps from active bookings, optionally for some lands only.
+
+        The bitmaps are built in a new dict that replaces the old one in a
+        single assignment, so a reader never sees a plot cleared but not yet
+        marked again.
+        """
+        from .availability import overlapping_bookings
+
+        # Built under the current version, so never from a lagging replica
+        bookings = overlapping_bookings(self.origin, self.end).using('default')
+        bitmaps = {}
+        if land_ids is not None:
+            bookings = bookings.filter(land_id__in=land_ids)
+            bitmaps = {land_id: bitmap for land_id, bitmap in self.bitmaps.items() if land_id not in land_ids}
+
+        rows = bookings.order_by().values_list('land_id', 'check_in', 'check_out')
+        for land_id, check_in, check_out in rows.iterator(chunk_size=2000):
+            bitmaps[land_id] = bitmaps.get(land_id, 0) | self._range_mask(check_in, check_out)
+        self.bitmaps = bitmaps
+
+
+def is_enabled():
+    """Check if the occupancy index is turned on in settings"""
+    return getattr(settings, 'AVAILABILITY_INDEX_ENABLED', False)
+
+
+def get_occupancy_index():
+    """
+    Get this process's occupancy index, rebuilding it when stale.
+
+    Returns None when the index is disabled.
+    """
+    global _index
+
+    if not is_enabled():
+        return None
+
+    today = timezone.now().date()
+    version = get_availability_version()
+    index = _index
+    if index is not None and index.origin == today and index.version == version:
+        return index
+
+    with _lock:
+        index = _index
+        if index is None or index.origin != today or index.version != version:
+            index = OccupancyIndex(today, version=version)
+            index.load()
+            _index = index
+    return index
+
+
+def invalidate(land_ids=None):
+    """
+    Record a change to availability.
+
+    Bumps the shared version. If this process's index was current up to the
+    previous version, a copy with only the given lands reloaded replaces it;
+    otherwise the index is dropped and rebuilt on the next lookup. Readers
+    take no lock, so the published index is never modified in place.
+    """
+    global _index
+
+    version = bump_availability_version()
+    if not is_enabled():
+        return
+
+    with _lock:
+        index = _index
+        if index is None:
+            return
+        if land_ids is not None and index.version == version - 1:
+            reloaded = OccupancyIndex(index.origin, index.horizon_days, version=version)
+            reloaded.bitmaps = index.bitmaps
+            reloaded.load(set(land_ids))
+            _index = reloaded
+        else:
+            _index = None
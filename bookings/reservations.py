@@ -0,0 +1,192 @@
+from datetime import timedelta
+from functools import partial
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from lands.models import Land
+from . import occupancy_index, rollups
+from .availability import active_holds, is_land_held, overlapping_bookings
+from .cache import bump_holds_version
+from .models import Booking, BookingHold
+
+
+# PostgreSQL SQLSTATEs of lock contention: lock_not_available,
+# serialization_failure and deadlock_detected
+LOCK_CONTENTION_SQLSTATES = {'55P03', '40001', '40P01'}
+
+
+class BookingUnavailable(Exception):
+    """Raised when a plot cannot be booked for the requested dates"""
+
+
+def _is_lock_contention(error):
+    """Whether an OperationalError means another transaction holds the lock we need"""
+    cause = error.__cause__
+    # psycopg 3 names it sqlstate, psycopg2 pgcode
+    sqlstate = getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+    if sqlstate:
+        return sqlstate in LOCK_CONTENTION_SQLSTATES
+    # SQLite: "database is locked", "database table is locked" or a busy error
+    message = str(error).lower()
+    return 'is locked' in message or 'busy' in message
+
+
+def lock_lands(land_ids):
+    """
+    Lock land rows for the rest of the current transaction.
+
+    Rows are locked in primary key order to avoid deadlocks. Backends without
+    row locks (SQLite) get a no-op UPDATE instead, which takes the database
+    write lock up front so concurrent bookings queue on the busy timeout
+    rather than failing mid-transaction. With SQLITE_TUNED the transaction
+    already began IMMEDIATE and holds the write lock.
+    """
+    land_ids = sorted(land_ids)
+    if connection.features.has_select_for_update:
+        list(Land.objects.select_for_update().filter(pk__in=land_ids).order_by('pk').values_list('pk'))
+    else:
+        Land.objects.filter(pk__in=land_ids).update(status=F('status'))
+
+
+def create_booking(land, check_in, check_out, holder=None, **fields):
+    """
+    Atomically create a pending booking if the land is free for the dates.
+
+    The land row is locked before the overlap check so two requests for the
+    same plot cannot both pass it. On PostgreSQL the booking_no_overlap
+    exclusion constraint backs this up. Holds placed by anyone other than
+    `holder` also block the booking; the holder's own holds on the land are
+    released. Raises BookingUnavailable on any conflict instead of retrying.
+    """
+    try:
+        with transaction.atomic():
+            lock_lands([land.pk])
+            if overlapping_bookings(check_in, check_out).filter(land=land).exists():
+                raise BookingUnavailable('This plot is no longer available for the selected dates.')
+            if is_land_held(land, check_in, check_out, holder=holder):
+                raise BookingUnavailable(
+                    'Another guest is completing a booking for this plot. Please try again in a few minutes.'
+                )
+            booking = Booking.objects.create(
+                land=land,
+                check_in=check_in,
+                check_out=check_out,
+                **fields
+            )
+            if holder:
+                release_holds(holder, land=land)
+            return booking
+    except IntegrityError as e:
+        raise BookingUnavailable('This plot is no longer available for the selected dates.') from e
+    except OperationalError as e:
+        # Only a lock wait that timed out is a conflict; other errors go to the error log
+        if not _is_lock_contention(e):
+            raise
+        raise BookingUnavailable('This plot is being booked by someone else. Please try again.') from e
+
+
+def create_group_booking(lands, check_in, check_out, holder=None, **fields):
+    """
+    Atomically book several lands for the same dates.
+
+    Availability of every land is checked with one query and all bookings
+    are inserted with one bulk_create, so the group either succeeds as a
+    whole or raises BookingUnavailable naming the plots that are taken.
+    bulk_create skips Booking.save() and post_save, so totals are computed
+    here and the statistics rollups and occupancy index are updated explicitly.
+    """
+    land_ids = [land.pk for land in lands]
+    try:
+        with transaction.atomic():
+            lock_lands(land_ids)
+
+            taken = set(
+                overlapping_bookings(check_in, check_out).filter(
+                    land_id__in=land_ids
+                ).values_list('land_id', flat=True)
+            )
+            taken.update(
+                active_holds(check_in, check_out, exclude_holder=holder).filter(
+                    land_id__in=land_ids
+                ).values_list('land_id', flat=True)
+            )
+            if taken:
+                names = ', '.join(land.name for land in lands if land.pk in taken)
+                raise BookingUnavailable(f'These plots are not available for the selected dates: {names}.')
+
+            bookings = []
+            for land in lands:
+                booking = Booking(
+                    land=land,
+                    check_in=check_in,
+                    check_out=check_out,
+                    price_per_night=land.price_per_night,
+                    **fields
+                )
+                booking.calculate_totals()
+                bookings.append(booking)
+            bookings = Booking.objects.bulk_create(bookings)
+            rollups.record_new_bookings(bookings)
+
+            if holder:
+                release_holds(holder)
+            transaction.on_commit(partial(occupancy_index.invalidate, land_ids))
+            return bookings
+    except IntegrityError as e:
+        raise BookingUnavailable('Some of these plots are no longer available for the selected dates.') from e
+    except OperationalError as e:
+        if not _is_lock_contention(e):
+            raise
+        raise BookingUnavailable('These plots are being booked by someone else. Please try again.') from e
+
+
+def hold_duration():
+    """How long a booking hold lasts"""
+    return timedelta(minutes=getattr(settings, 'BOOKING_HOLD_MINUTES', 10))
+
+
+def sweep_expired_holds():
+    """Delete holds that have expired"""
+    deleted = BookingHold.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+    if deleted:
+        transaction.on_commit(bump_holds_version)
+    return deleted
+
+
+def place_hold(land, check_in, check_out, holder):
+    """
+    Hold a land for the given dates while the guest fills in the form.
+
+    A holder keeps at most one hold; placing a new one replaces it. The land
+    row is locked before checking for other guests' holds, so two guests
+    opening the form at once cannot both hold the plot; the second gets
+    BookingUnavailable. Expired holds are swept lazily here instead of by a
+    scheduled job.
+    """
+    sweep_expired_holds()
+    with transaction.atomic():
+        lock_lands([land.pk])
+        if is_land_held(land, check_in, check_out, holder=holder):
+            raise BookingUnavailable(
+                'Another guest is completing a booking for this plot. Please try again in a few minutes.'
+            )
+        release_holds(holder)
+        hold = BookingHold.objects.create(
+            land=land,
+            check_in=check_in,
+            check_out=check_out,
+            holder=holder,
+            expires_at=timezone.now() + hold_duration()
+        )
+    transaction.on_commit(bump_holds_version)
+    return hold
+
+
+def release_holds(holder, land=None):
+    """Release the holds placed by a holder, optionally only on one land"""
+    holds = BookingHold.objects.filter(holder=holder)
+    if land is not None:
+        holds = holds.filter(land=land)
+    if holds.delete()[0]:
+        transaction.on_commit(bump_holds_version)
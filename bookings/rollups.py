@@ -0,0 +1,201 @@
+"""
+Daily booking statistics rollups.
+
+DailyBookingStats and LandDailyStats hold per-day counters for bookings by
+creation date, and LandStats the all-time totals per land. They are kept
+current incrementally: every booking change subtracts the booking's previous
+contribution and adds its new one, so a status move such as pending ->
+confirmed shifts revenue between buckets. rebuild_stats() recomputes them
+from scratch in batches.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Min, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import Booking, DailyBookingStats, LandDailyStats, LandStats
+
+
+# Booking statuses that count towards revenue
+REVENUE_STATUSES = ['confirmed', 'completed']
+
+STATUS_COUNTERS = {
+    'pending': 'pending_count',
+    'confirmed': 'confirmed_count',
+    'cancelled': 'cancelled_count',
+    'completed': 'completed_count',
+}
+
+STATS_FIELDS = [
+    'bookings_count', 'pending_count', 'confirmed_count', 'cancelled_count',
+    'completed_count', 'total_nights', 'total_value', 'revenue_bookings', 'revenue',
+]
+
+
+def booking_state(booking):
+    """The fields of a booking the rollups depend on"""
+    return {
+        'date': timezone.localtime(booking['created_at']).date(),
+        'land_id': booking['land_id'],
+        'status': booking['status'],
+        'total_price': booking['total_price'] or Decimal('0'),
+        'total_nights': booking['total_nights'] or 0,
+    }
+
+
+def instance_state(booking):
+    """Rollup state of a Booking instance"""
+    return booking_state({
+        'created_at': booking.created_at,
+        'land_id': booking.land_id,
+        'status': booking.status,
+        'total_price': booking.total_price,
+        'total_nights': booking.total_nights,
+    })
+
+
+def stored_state(booking_id):
+    """Rollup state of a booking as currently stored, or None"""
+    row = Booking.objects.filter(pk=booking_id).values(
+        'created_at', 'land_id', 'status', 'total_price', 'total_nights'
+    ).first()
+    return booking_state(row) if row else None
+
+
+def contribution(state):
+    """Counter values a single booking adds to its day"""
+    counters = {field: 0 for field in STATS_FIELDS}
+    counters['bookings_count'] = 1
+    counters['total_nights'] = state['total_nights']
+    counters['total_value'] = state['total_price']
+    if state['status'] in STATUS_COUNTERS:
+        counters[STATUS_COUNTERS[state['status']]] = 1
+    if state['status'] in REVENUE_STATUSES:
+        counters['revenue_bookings'] = 1
+        counters['revenue'] = state['total_price']
+    return counters
+
+
+def _apply(state, sign):
+    """Add (sign=1) or remove (sign=-1) one booking's contribution"""
+    changes = {
+        field: F(field) + sign * value
+        for field, value in contribution(state).items()
+        if value
+    }
+    targets = [
+        (DailyBookingStats.objects, {'date': state['date']}),
+        (LandDailyStats.objects, {'date': state['date'], 'land_id': state['land_id']}),
+        (LandStats.objects, {'land_id': state['land_id']}),
+    ]
+    for manager, lookup in targets:
+        if sign > 0:
+            manager.get_or_create(**lookup)
+        manager.filter(**lookup).update(**changes)
+
+
+def record_change(old_state, new_state):
+    """Move a booking's contribution from its old state to its new one"""
+    if old_state == new_state:
+        return
+    with transaction.atomic():
+        if old_state is not None:
+            _apply(old_state, -1)
+        if new_state is not None:
+            _apply(new_state, 1)
+
+
+def record_new_bookings(bookings):
+    """Add bookings created without post_save (e.g. by bulk_create)"""
+    with transaction.atomic():
+        for booking in bookings:
+            _apply(instance_state(booking), 1)
+
+
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _grouped_rows(start, end):
+    """Per (day, land) counters for bookings created in [start, end)"""
+    revenue = Q(status__in=REVENUE_STATUSES)
+    aggregates = {
+        'bookings_count': Count('id'),
+        'total_nights': Sum('total_nights'),
+        'total_value': Sum('total_price'),
+        'revenue_bookings': Count('id', filter=revenue),
+        'revenue': Sum('total_price', filter=revenue),
+    }
+    for status, field in STATUS_COUNTERS.items():
+        aggregates[field] = Count('id', filter=Q(status=status))
+
+    # Compare against local midnights so the range can use an index
+    return Booking.objects.filter(
+        created_at__gte=_local_midnight(start),
+        created_at__lt=_local_midnight(end)
+    ).annotate(
+        day=TruncDate('created_at')
+    ).order_by().values('day', 'land_id').annotate(**aggregates)
+
+
+def rebuild_stats(start=None, end=None, batch_days=31, batch_size=1000, log=None):
+    """
+    Recompute the rollups for bookings created in [start, end).
+
+    Works through the range batch_days at a time, one grouped query and one
+    transaction per batch. Defaults to the full range of existing bookings.
+    Returns the number of days rebuilt.
+    """
+    if start is None or end is None:
+        bounds = Booking.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+        if bounds['first'] is None:
+            DailyBookingStats.objects.all().delete()
+            LandDailyStats.objects.all().delete()
+            LandStats.objects.all().delete()
+            return 0
+        start = start or timezone.localtime(bounds['first']).date()
+        end = end or timezone.localtime(bounds['last']).date() + timedelta(days=1)
+
+    batch_start = start
+    while batch_start < end:
+        batch_end = min(batch_start + timedelta(days=batch_days), end)
+
+        daily = {}
+        land_rows = []
+        for row in _grouped_rows(batch_start, batch_end):
+            values = {field: row[field] or 0 for field in STATS_FIELDS}
+            land_rows.append(LandDailyStats(land_id=row['land_id'], date=row['day'], **values))
+            totals = daily.setdefault(row['day'], {field: 0 for field in STATS_FIELDS})
+            for field in STATS_FIELDS:
+                totals[field] += values[field]
+
+        with transaction.atomic():
+            DailyBookingStats.objects.filter(date__gte=batch_start, date__lt=batch_end).delete()
+            LandDailyStats.objects.filter(date__gte=batch_start, date__lt=batch_end).delete()
+            DailyBookingStats.objects.bulk_create(
+                [DailyBookingStats(date=day, **values) for day, values in daily.items()],
+                batch_size=batch_size
+            )
+            LandDailyStats.objects.bulk_create(land_rows, batch_size=batch_size)
+
+        if log:
+            log(f'{batch_start} to {batch_end}: {len(daily)} days, {len(land_rows)} plot-days')
+        batch_start = batch_end
+
+    rebuild_land_totals(batch_size=batch_size)
+    return (end - start).days
+
+
+def rebuild_land_totals(batch_size=1000):
+    """Recompute the all-time LandStats totals from the per-land daily rows"""
+    rows = LandDailyStats.objects.order_by().values('land_id').annotate(
+        **{f'sum_{field}': Sum(field) for field in STATS_FIELDS}
+    )
+    totals = [
+        LandStats(land_id=row['land_id'], **{field: row[f'sum_{field}'] or 0 for field in STATS_FIELDS})
+        for row in rows
+    ]
+    with transaction.atomic():
+        LandStats.objects.all().delete()
+        LandStats.objects.bulk_create(totals, batch_size=batch_size)
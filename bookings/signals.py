@@ -0,0 +1,50 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from lands.models import Land
+from . import occupancy_index, rollups
+from .models import Booking
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_changed(sender, instance, **kwargs):
+    """Invalidate availability data for the booking's land, and the land it moved from"""
+    land_ids = {instance.land_id}
+    previous_land_id = getattr(instance, '_previous_land_id', None)
+    if previous_land_id is not None:
+        land_ids.add(previous_land_id)
+    transaction.on_commit(partial(occupancy_index.invalidate, sorted(land_ids)))
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_state(sender, instance, raw=False, **kwargs):
+    """Keep the stored state of a booking so post_save can adjust the rollups and the index"""
+    if raw:
+        instance._previous_land_id = None
+        return
+    instance._rollup_state = rollups.stored_state(instance.pk) if instance.pk else None
+    instance._previous_land_id = instance._rollup_state['land_id'] if instance._rollup_state else None
+
+
+@receiver(post_save, sender=Booking)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    """Move the booking's contribution to the daily statistics"""
+    if raw:
+        return
+    rollups.record_change(getattr(instance, '_rollup_state', None), rollups.instance_state(instance))
+    instance._rollup_state = None
+
+
+@receiver(post_delete, sender=Booking)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    """Remove the booking's contribution from the daily statistics"""
+    rollups.record_change(rollups.instance_state(instance), None)
+
+
+@receiver(post_save, sender=Land)
+@receiver(post_delete, sender=Land)
+def land_changed(sender, instance, **kwargs):
+    """Invalidate availability data for the land"""
+    transaction.on_commit(partial(occupancy_index.invalidate, [instance.pk]))
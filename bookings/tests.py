@@ -1,3 +1,757 @@
-from django.test import TestCase
+import csv
+import json
+import threading
+from unittest import mock
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from campland.replica import PIN_SESSION_KEY, ReplicaRouter, replica_reads
+from campland.testing import TEST_STORAGES
+from lands.models import Land
+from . import occupancy_index
+from .availability import (
+    GRID_CONFIRMED,
+    GRID_FREE,
+    GRID_PENDING,
+    _free_start_dates,
+    build_occupancy_grid,
+    find_flexible_availability,
+    is_land_held,
+    occupied_nights,
+    split_lands_by_availability,
+)
+from .cache import search_cache_stats
+from .export import export_lines, filter_bookings
+from .models import Booking, BookingHold, DailyBookingStats, LandDailyStats, LandStats
+from .occupancy_index import OccupancyIndex, get_availability_version, get_occupancy_index
+from .reservations import (
+    BookingUnavailable,
+    create_booking,
+    create_group_booking,
+    place_hold,
+    release_holds,
+    sweep_expired_holds,
+)
+from .rollups import STATS_FIELDS, rebuild_stats
 
-# Create your tests here.
+
+def make_land(**kwargs):
+    defaults = {
+        'name': 'Test Plot',
+        'description': 'A plot for tests',
+        'size': Decimal('100.00'),
+        'capacity': 4,
+        'price_per_night': Decimal('50.00'),
+    }
+    defaults.update(kwargs)
+    return Land.objects.create(**defaults)
+
+
+def booking_fields(**kwargs):
+    defaults = {
+        'guest_name': 'Test Guest',
+        'guest_email': 'guest@example.com',
+        'guest_phone': '',
+        'number_of_guests': 2,
+        'price_per_night': Decimal('50.00'),
+        'status': 'pending',
+    }
+    defaults.update(kwargs)
+    return defaults
+
+
+class IntervalArithmeticTests(SimpleTestCase):
+    """Booking intervals clipped to a window of nights"""
+
+    start = date(2026, 7, 1)
+    end = date(2026, 7, 11)
+
+    def test_occupied_nights_clip_to_the_window(self):
+        occupied = occupied_nights([
+            (date(2026, 6, 28), date(2026, 7, 3)),   # straddles the start
+            (date(2026, 7, 5), date(2026, 7, 7)),
+            (date(2026, 7, 6), date(2026, 7, 8)),    # overlaps the previous one
+            (date(2026, 7, 10), date(2026, 7, 15)),  # straddles the end
+            (date(2026, 7, 11), date(2026, 7, 12)),  # starts at the end
+        ], self.start, self.end)
+
+        self.assertEqual(list(occupied), [1, 1, 0, 0, 1, 1, 1, 0, 0, 1])
+
+    def test_free_starts_skip_straddling_and_overlapping_stays(self):
+        intervals = [
+            (date(2026, 6, 28), date(2026, 7, 3)),
+            (date(2026, 7, 5), date(2026, 7, 8)),
+            (date(2026, 7, 6), date(2026, 7, 7)),
+        ]
+        starts = _free_start_dates(intervals, self.start, self.end, 2)
+
+        # 3-5 July fits; a stay ending exactly at the window end fits too
+        self.assertEqual(starts, [date(2026, 7, 3), date(2026, 7, 8), date(2026, 7, 9)])
+
+    def test_free_starts_with_a_stay_past_the_window_end(self):
+        intervals = [(date(2026, 7, 9), date(2026, 7, 20))]
+
+        self.assertEqual(
+            _free_start_dates(intervals, self.start, self.end, 4),
+            [self.start + timedelta(days=i) for i in range(5)],
+        )
+        self.assertEqual(_free_start_dates([], self.start, self.end, 10), [self.start])
+        self.assertEqual(_free_start_dates([], self.start, self.end, 11), [])
+
+
+class OccupancyGridTests(TestCase):
+    """Park-wide occupancy grid"""
+
+    def test_confirmed_nights_take_precedence_over_pending(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('The exclusion constraint rejects overlapping active bookings')
+        land = make_land()
+        start = date(2026, 7, 1)
+        Booking.objects.create(land=land, check_in=date(2026, 6, 29), check_out=date(2026, 7, 4),
+                               **booking_fields(status='pending'))
+        Booking.objects.create(land=land, check_in=date(2026, 7, 3), check_out=date(2026, 7, 6),
+                               **booking_fields(status='confirmed'))
+        Booking.objects.create(land=land, check_in=date(2026, 7, 5), check_out=date(2026, 7, 9),
+                               **booking_fields(status='cancelled'))
+
+        grid = build_occupancy_grid(start, start + timedelta(days=7))
+
+        P, C, F = GRID_PENDING, GRID_CONFIRMED, GRID_FREE
+        self.assertEqual(list(grid.row(0)), [P, P, C, C, C, F, F])
+        self.assertEqual(grid.as_dict()['plots'][0]['cells'], '1122200')
+
+
+class OccupancyBitmapTests(TestCase):
+    """Night bitmaps of the occupancy index"""
+
+    origin = date(2026, 7, 1)
+
+    def test_nights_are_half_open(self):
+        index = OccupancyIndex(self.origin, horizon_days=30)
+        index.mark(1, date(2026, 7, 3), date(2026, 7, 5))
+
+        self.assertEqual(index.bitmaps[1], 0b1100)
+        self.assertTrue(index.is_booked(1, date(2026, 7, 4), date(2026, 7, 6)))
+        # Check-out day is free for the next arrival, and vice versa
+        self.assertFalse(index.is_booked(1, date(2026, 7, 5), date(2026, 7, 7)))
+        self.assertFalse(index.is_booked(1, date(2026, 7, 1), date(2026, 7, 3)))
+        self.assertFalse(index.is_booked(2, date(2026, 7, 3), date(2026, 7, 5)))
+
+    def test_stays_are_clipped_to_the_horizon(self):
+        index = OccupancyIndex(self.origin, horizon_days=10)
+        index.mark(1, date(2026, 6, 28), date(2026, 7, 2))
+        index.mark(1, date(2026, 7, 10), date(2026, 7, 20))
+
+        self.assertEqual(index.bitmaps[1], 0b1000000001)
+        self.assertTrue(index.covers(self.origin, date(2026, 7, 11)))
+        self.assertFalse(index.covers(self.origin, date(2026, 7, 12)))
+        self.assertFalse(index.covers(date(2026, 6, 30), date(2026, 7, 2)))
+
+
+@override_settings(AVAILABILITY_INDEX_ENABLED=True)
+class OccupancyIndexTests(TestCase):
+    """The index reloads changed plots and follows the shared version"""
+
+    def setUp(self):
+        cache.clear()
+        occupancy_index._index = None
+        self.addCleanup(setattr, occupancy_index, '_index', None)
+        self.lands = [make_land(name=f'Plot {i}') for i in range(2)]
+        self.check_in = timezone.now().date() + timedelta(days=5)
+        self.check_out = self.check_in + timedelta(days=2)
+
+    def booked(self):
+        index = get_occupancy_index()
+        return [index.is_booked(land.pk, self.check_in, self.check_out) for land in self.lands]
+
+    def test_partial_reload_only_touches_given_lands(self):
+        index = OccupancyIndex(timezone.now().date())
+        index.mark(self.lands[0].pk, self.check_in, self.check_out)
+        index.mark(self.lands[1].pk, self.check_in, self.check_out)
+
+        published = index.bitmaps
+
+        # No bookings are stored, so a reloaded plot comes back empty
+        index.load([self.lands[0].pk])
+        self.assertNotIn(self.lands[0].pk, index.bitmaps)
+        self.assertIn(self.lands[1].pk, index.bitmaps)
+        # Readers still holding the old bitmaps never see the plot cleared
+        self.assertIn(self.lands[0].pk, published)
+
+    def test_change_publishes_a_new_index(self):
+        index = get_occupancy_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(land=self.lands[0], check_in=self.check_in, check_out=self.check_out,
+                                   **booking_fields())
+
+        self.assertIsNot(get_occupancy_index(), index)
+        self.assertEqual(index.bitmaps, {})
+        self.assertEqual(index.version, get_availability_version() - 1)
+        self.assertEqual(self.booked(), [True, False])
+
+    def test_changes_bump_the_version_and_reload(self):
+        self.assertEqual(self.booked(), [False, False])
+        version = get_availability_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(land=self.lands[0], check_in=self.check_in, check_out=self.check_out,
+                                   **booking_fields())
+        self.assertEqual(get_availability_version(), version + 1)
+        self.assertEqual(get_occupancy_index().version, version + 1)
+        self.assertEqual(self.booked(), [True, False])
+
+    def test_index_behind_the_shared_version_is_rebuilt(self):
+        stale = get_occupancy_index()
+        Booking.objects.create(land=self.lands[1], check_in=self.check_in, check_out=self.check_out,
+                               **booking_fields())
+        # Another worker recorded the change
+        occupancy_index.bump_availability_version()
+
+        self.assertIsNot(get_occupancy_index(), stale)
+        self.assertEqual(self.booked(), [False, True])
+
+    def test_moved_booking_frees_its_previous_plot(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(land=self.lands[0], check_in=self.check_in,
+                                             check_out=self.check_out, **booking_fields())
+        self.assertEqual(self.booked(), [True, False])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.land = self.lands[1]
+            booking.save()
+        self.assertEqual(self.booked(), [False, True])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = 'cancelled'
+            booking.save()
+        self.assertEqual(self.booked(), [False, False])
+        available, booked = split_lands_by_availability(self.check_in, self.check_out)
+        self.assertEqual(booked, [])
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Many simultaneous requests for one plot must produce one booking"""
+
+    thread_count = 12
+
+    def test_concurrent_requests_book_plot_once(self):
+        land = make_land()
+        check_in = timezone.now().date() + timedelta(days=30)
+        check_out = check_in + timedelta(days=3)
+
+        barrier = threading.Barrier(self.thread_count)
+        results = []
+        errors = []
+
+        def attempt():
+            try:
+                barrier.wait()
+                create_booking(land, check_in, check_out, **booking_fields())
+                results.append('booked')
+            except BookingUnavailable as e:
+                # Queued on the plot lock, the overlap re-check then sees the
+                # winner's booking; a lock error means the lock did not hold
+                results.append('rejected' if e.__cause__ is None else repr(e.__cause__))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attempt) for _ in range(self.thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count('booked'), 1)
+        self.assertEqual(results.count('rejected'), self.thread_count - 1)
+        self.assertEqual(Booking.objects.filter(land=land).count(), 1)
+
+    def test_adjacent_stays_are_allowed(self):
+        land = make_land()
+        check_in = timezone.now().date() + timedelta(days=30)
+
+        create_booking(land, check_in, check_in + timedelta(days=2), **booking_fields())
+        create_booking(
+            land, check_in + timedelta(days=2), check_in + timedelta(days=4), **booking_fields()
+        )
+
+        with self.assertRaises(BookingUnavailable):
+            create_booking(
+                land, check_in + timedelta(days=1), check_in + timedelta(days=3), **booking_fields()
+            )
+
+
+    def test_only_lock_contention_is_reported_as_a_conflict(self):
+        land = make_land()
+        check_in = timezone.now().date() + timedelta(days=30)
+        check_out = check_in + timedelta(days=2)
+
+        with mock.patch('bookings.reservations.lock_lands', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(BookingUnavailable):
+                create_booking(land, check_in, check_out, **booking_fields())
+            with self.assertRaises(BookingUnavailable):
+                create_group_booking([land], check_in, check_out, **group_booking_fields())
+        with mock.patch('bookings.reservations.lock_lands', side_effect=OperationalError('disk I/O error')):
+            with self.assertRaises(OperationalError):
+                create_booking(land, check_in, check_out, **booking_fields())
+            with self.assertRaises(OperationalError):
+                create_group_booking([land], check_in, check_out, **group_booking_fields())
+
+
+def group_booking_fields(**kwargs):
+    fields = booking_fields(**kwargs)
+    del fields['price_per_night']
+    return fields
+
+
+class GroupBookingTests(TransactionTestCase):
+    """Group bookings succeed or fail as a whole"""
+
+    def test_group_booking_sets_totals(self):
+        lands = [make_land(name=f'Plot {i}', price_per_night=Decimal('40.00')) for i in range(3)]
+        check_in = timezone.now().date() + timedelta(days=10)
+
+        bookings = create_group_booking(lands, check_in, check_in + timedelta(days=3), **group_booking_fields())
+
+        self.assertEqual(len(bookings), 3)
+        for booking in Booking.objects.all():
+            self.assertEqual(booking.total_nights, 3)
+            self.assertEqual(booking.total_price, Decimal('120.00'))
+
+    def test_group_booking_is_all_or_nothing(self):
+        lands = [make_land(name=f'Plot {i}') for i in range(3)]
+        check_in = timezone.now().date() + timedelta(days=10)
+        create_booking(lands[1], check_in, check_in + timedelta(days=1), **booking_fields())
+
+        with self.assertRaises(BookingUnavailable):
+            create_group_booking(lands, check_in, check_in + timedelta(days=3), **group_booking_fields())
+
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class BookingHoldTests(TestCase):
+    """Holds block other guests while one fills in the booking form"""
+
+    def setUp(self):
+        self.land = make_land()
+        self.check_in = timezone.now().date() + timedelta(days=10)
+        self.check_out = self.check_in + timedelta(days=2)
+
+    def test_new_hold_replaces_the_holders_previous_one(self):
+        place_hold(self.land, self.check_in, self.check_out, 'guest-a')
+        other = make_land(name='Other Plot')
+        hold = place_hold(other, self.check_in, self.check_out, 'guest-a')
+
+        self.assertEqual(list(BookingHold.objects.filter(holder='guest-a')), [hold])
+
+    def test_expired_holds_are_swept_and_do_not_block(self):
+        hold = place_hold(self.land, self.check_in, self.check_out, 'guest-a')
+        BookingHold.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertFalse(is_land_held(self.land, self.check_in, self.check_out, holder='guest-b'))
+        self.assertEqual(sweep_expired_holds(), 1)
+        self.assertFalse(BookingHold.objects.exists())
+
+    def test_hold_blocks_other_guests_only(self):
+        place_hold(self.land, self.check_in, self.check_out, 'guest-a')
+
+        self.assertTrue(is_land_held(self.land, self.check_in, self.check_out, holder='guest-b'))
+        self.assertFalse(is_land_held(self.land, self.check_in, self.check_out, holder='guest-a'))
+        available, booked = split_lands_by_availability(self.check_in, self.check_out, holder='guest-b')
+        self.assertEqual(booked, [self.land])
+        self.assertTrue(booked[0].is_held)
+        available, booked = split_lands_by_availability(self.check_in, self.check_out, holder='guest-a')
+        self.assertEqual(available, [self.land])
+
+        with self.assertRaises(BookingUnavailable):
+            create_booking(self.land, self.check_in, self.check_out, holder='guest-b', **booking_fields())
+
+    def test_second_holder_is_refused_while_the_hold_is_live(self):
+        place_hold(self.land, self.check_in, self.check_out, 'guest-a')
+
+        with self.assertRaises(BookingUnavailable):
+            place_hold(self.land, self.check_in + timedelta(days=1), self.check_out, 'guest-b')
+        self.assertEqual(list(BookingHold.objects.values_list('holder', flat=True)), ['guest-a'])
+        # The first guest can still book
+        create_booking(self.land, self.check_in, self.check_out, holder='guest-a', **booking_fields())
+
+    def test_booking_form_refuses_a_plot_held_by_another_guest(self):
+        place_hold(self.land, self.check_in, self.check_out, 'guest-a')
+
+        response = self.client.get(
+            f'/bookings/book/{self.land.pk}/',
+            {'check_in': self.check_in.isoformat(), 'check_out': self.check_out.isoformat()},
+        )
+
+        self.assertRedirects(response, '/bookings/search/', fetch_redirect_response=False)
+        self.assertEqual(BookingHold.objects.count(), 1)
+
+    def test_booking_releases_the_holders_hold(self):
+        place_hold(self.land, self.check_in, self.check_out, 'guest-a')
+        create_booking(self.land, self.check_in, self.check_out, holder='guest-a', **booking_fields())
+
+        self.assertFalse(BookingHold.objects.exists())
+
+    def test_release_only_touches_the_given_land(self):
+        place_hold(self.land, self.check_in, self.check_out, 'guest-a')
+        release_holds('guest-a', land=make_land(name='Other Plot'))
+        self.assertTrue(BookingHold.objects.exists())
+        release_holds('guest-a')
+        self.assertFalse(BookingHold.objects.exists())
+
+    def test_flexible_search_skips_nights_held_by_others(self):
+        window_end = self.check_in + timedelta(days=4)
+        place_hold(self.land, self.check_in + timedelta(days=1), self.check_out, 'guest-a')
+
+        [(land, starts)] = find_flexible_availability(self.check_in, window_end, 2, holder='guest-b')
+        self.assertEqual(starts, [self.check_in + timedelta(days=2)])
+        [(land, starts)] = find_flexible_availability(self.check_in, window_end, 2, holder='guest-a')
+        self.assertEqual(len(starts), 3)
+
+
+class DailyStatsRollupTests(TransactionTestCase):
+    """Incrementally maintained rollups must match a full rebuild"""
+
+    def snapshot(self):
+        daily = list(DailyBookingStats.objects.order_by('date').values('date', *STATS_FIELDS))
+        per_land = list(LandDailyStats.objects.order_by('date', 'land_id').values('date', 'land_id', *STATS_FIELDS))
+        land_totals = list(LandStats.objects.order_by('land_id').values('land_id', *STATS_FIELDS))
+        return daily, per_land, land_totals
+
+    def test_incremental_rollups_match_rebuild(self):
+        lands = [make_land(name=f'Plot {i}') for i in range(3)]
+        check_in = timezone.now().date() + timedelta(days=5)
+
+        first = create_booking(lands[0], check_in, check_in + timedelta(days=2), **booking_fields())
+        second = create_booking(lands[1], check_in, check_in + timedelta(days=4), **booking_fields())
+        create_group_booking(lands, check_in + timedelta(days=10), check_in + timedelta(days=12),
+                             **group_booking_fields(status='confirmed'))
+
+        first.status = 'confirmed'
+        first.save()
+        second.status = 'cancelled'
+        second.save()
+        first.status = 'completed'
+        first.save()
+        second.delete()
+
+        incremental = self.snapshot()
+        rebuild_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+        stats = DailyBookingStats.objects.get()
+        self.assertEqual(stats.bookings_count, 4)
+        self.assertEqual(stats.completed_count, 1)
+        self.assertEqual(stats.confirmed_count, 3)
+        self.assertEqual(stats.revenue_bookings, 4)
+        self.assertEqual(stats.revenue, Decimal('400.00'))
+        self.assertEqual(LandStats.objects.get(land=lands[0]).bookings_count, 2)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class BookingExportTests(TestCase):
+    """Booking exports stream every selected row"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        land = Land.objects.create(
+            name='Plot, "A"',
+            description='A plot for tests',
+            size=Decimal('100.00'),
+            capacity=4,
+        )
+        check_in = date(2026, 7, 1)
+        for i, status in enumerate(['pending', 'confirmed', 'cancelled', 'confirmed']):
+            Booking.objects.create(
+                land=land,
+                guest_name=f'Guest {i}',
+                guest_email='guest@example.com',
+                guest_phone='',
+                number_of_guests=2,
+                check_in=check_in + timedelta(days=i * 3),
+                check_out=check_in + timedelta(days=i * 3 + 2),
+                price_per_night=Decimal('50.00'),
+                status=status,
+            )
+
+    def test_filtered_jsonl_export(self):
+        bookings = filter_bookings(statuses=['confirmed'], start=date(2026, 7, 1), end=date(2026, 7, 10))
+        rows = [json.loads(line) for line in export_lines(bookings, 'jsonl', chunk_size=1)]
+
+        self.assertEqual([row['guest_name'] for row in rows], ['Guest 1'])
+        self.assertEqual(rows[0]['total_price'], '100.00')
+        self.assertEqual(rows[0]['land_name'], 'Plot, "A"')
+
+    def test_admin_csv_action_streams(self):
+        self.client.force_login(self.admin)
+        response = self.client.post('/admin/bookings/booking/', {
+            'action': 'export_csv',
+            '_selected_action': list(Booking.objects.values_list('pk', flat=True)),
+        })
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:3], ['id', 'land_id', 'land_name'])
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1][2], 'Plot, "A"')
+
+
+@override_settings(STORAGES=TEST_STORAGES, SEARCH_CACHE_SECONDS=60)
+class SearchCacheTests(TestCase):
+    """Rendered searches are reused until availability or holds change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.land = make_land()
+        cls.check_in = timezone.now().date() + timedelta(days=10)
+        cls.check_out = cls.check_in + timedelta(days=2)
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self):
+        return self.client.get('/bookings/search/', {
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+        })
+
+    def book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(land=self.land, check_in=self.check_in, check_out=self.check_out,
+                                   **booking_fields())
+
+    def test_repeat_search_is_a_hit(self):
+        self.assertTemplateUsed(self.search(), 'bookings/search.html')
+        self.assertTemplateNotUsed(self.search(), 'bookings/search.html')
+        stats = search_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_booking_bumps_the_version(self):
+        self.search()
+        self.book()
+
+        response = self.search()
+        self.assertEqual(response.context['booked_lands'], [self.land])
+        self.assertEqual(search_cache_stats()['misses'], 2)
+
+    def test_hold_bumps_the_version(self):
+        self.search()
+        with self.captureOnCommitCallbacks(execute=True):
+            place_hold(self.land, self.check_in, self.check_out, 'guest-a')
+
+        self.assertEqual(self.search().context['booked_lands'], [self.land])
+
+    def test_page_built_during_a_booking_is_not_served_after_it(self):
+        def book_while_rendering(*args, **kwargs):
+            result = split_lands_by_availability(*args, **kwargs)
+            self.book()
+            return result
+
+        with mock.patch('bookings.views.split_lands_by_availability', side_effect=book_while_rendering):
+            stale = self.search()
+        self.assertEqual(stale.context['available_lands'], [self.land])
+
+        self.assertEqual(self.search().context['booked_lands'], [self.land])
+
+
+@override_settings(STORAGES=TEST_STORAGES, SEARCH_CACHE_SECONDS=0)
+class ConditionalResponseTests(TestCase):
+    """Search and confirmation pages answer 304 until their data changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.land = make_land()
+        cls.check_in = timezone.now().date() + timedelta(days=10)
+        cls.dates = {
+            'check_in': cls.check_in.isoformat(),
+            'check_out': (cls.check_in + timedelta(days=2)).isoformat(),
+        }
+
+    def search(self, etag=None):
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.client.get('/bookings/search/', self.dates, headers=headers)
+
+    def test_search_is_conditional_until_availability_changes(self):
+        etag = self.search()['ETag']
+        self.assertEqual(self.search(etag).status_code, 304)
+
+        Booking.objects.create(land=self.land, check_in=self.check_in,
+                               check_out=self.check_in + timedelta(days=1), **booking_fields())
+        response = self.search(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(SEARCH_CACHE_SECONDS=60)
+    def test_search_revalidates_from_the_cache_versions(self):
+        cache.clear()
+        etag = self.search()['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search(etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Booking.objects.create(land=self.land, check_in=self.check_in,
+                                   check_out=self.check_in + timedelta(days=1), **booking_fields())
+        self.assertEqual(self.search(etag).status_code, 200)
+
+    def test_confirmation_is_conditional_until_the_booking_changes(self):
+        booking = Booking.objects.create(land=self.land, check_in=self.check_in,
+                                         check_out=self.check_in + timedelta(days=2), **booking_fields())
+        url = f'/bookings/confirmation/{booking.pk}/'
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+        booking.status = 'confirmed'
+        booking.save()
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_personal_pages_send_no_etag(self):
+        booking = Booking.objects.create(land=self.land, check_in=self.check_in + timedelta(days=5),
+                                         check_out=self.check_in + timedelta(days=6), **booking_fields())
+        # Opening the booking form holds the plot for this guest
+        self.client.get(f'/bookings/book/{self.land.pk}/', self.dates)
+
+        self.assertNotIn('ETag', self.search())
+        confirmation = self.client.get(f'/bookings/confirmation/{booking.pk}/')
+        self.assertEqual(confirmation.status_code, 200)
+        self.assertNotIn('ETag', confirmation)
+        self.assertNotIn('Last-Modified', confirmation)
+
+
+@override_settings(STORAGES=TEST_STORAGES, SEARCH_CACHE_SECONDS=0)
+class AsyncViewTests(TestCase):
+    """The public read views run as async views"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.land = make_land()
+        cls.check_in = timezone.now().date() + timedelta(days=10)
+        cls.booking = Booking.objects.create(
+            land=cls.land,
+            check_in=cls.check_in,
+            check_out=cls.check_in + timedelta(days=2),
+            **booking_fields(status='confirmed')
+        )
+
+    async def test_search_lists_booked_plot(self):
+        response = await self.async_client.get('/bookings/search/', {
+            'check_in': self.check_in.isoformat(),
+            'check_out': (self.check_in + timedelta(days=1)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['booked_lands'], [self.land])
+
+    async def test_calendar_is_conditional(self):
+        url = f'/bookings/calendar/{self.land.pk}/'
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        cached = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(cached.status_code, 304)
+
+    async def test_missing_objects_are_404(self):
+        self.assertEqual((await self.async_client.get('/bookings/calendar/0/')).status_code, 404)
+        self.assertEqual((await self.async_client.get('/bookings/confirmation/0/')).status_code, 404)
+
+    async def test_confirmation_and_home(self):
+        response = await self.async_client.get(f'/bookings/confirmation/{self.booking.pk}/')
+        self.assertContains(response, self.land.name)
+        self.assertEqual((await self.async_client.get('/')).status_code, 200)
+
+
+class RecordingRouter(ReplicaRouter):
+    """ReplicaRouter noting the alias chosen for each read"""
+    reads = []
+
+    def db_for_read(self, model, **hints):
+        alias = super().db_for_read(model, **hints)
+        self.reads.append(alias)
+        return alias
+
+
+# The test database stands in for the replica: reads routed to it are
+# recorded as 'default', reads left on the primary as None
+@override_settings(
+    STORAGES=TEST_STORAGES,
+    SEARCH_CACHE_SECONDS=0,
+    DATABASE_REPLICA='default',
+    DATABASE_ROUTERS=['bookings.tests.RecordingRouter'],
+)
+class ReplicaRoutingTests(TestCase):
+    """Search reads use the replica until the session writes a booking"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.land = make_land()
+        cls.check_in = timezone.now().date() + timedelta(days=10)
+        cls.dates = {
+            'check_in': cls.check_in.isoformat(),
+            'check_out': (cls.check_in + timedelta(days=2)).isoformat(),
+        }
+
+    def setUp(self):
+        RecordingRouter.reads.clear()
+
+    def search_reads(self):
+        RecordingRouter.reads.clear()
+        response = self.client.get('/bookings/search/', self.dates)
+        self.assertEqual(response.status_code, 200)
+        return set(RecordingRouter.reads)
+
+    def test_search_reads_from_replica(self):
+        self.assertEqual(self.search_reads(), {'default'})
+        self.assertNotIn(PIN_SESSION_KEY, self.client.session)
+
+    def test_booking_pins_session_to_primary(self):
+        url = f"/bookings/book/{self.land.pk}/?check_in={self.dates['check_in']}&check_out={self.dates['check_out']}"
+        response = self.client.post(url, {
+            'first_name': 'Test',
+            'last_name': 'Guest',
+            'guest_email': 'guest@example.com',
+            'number_of_persons': 2,
+        })
+        booking = Booking.objects.get(land=self.land)
+        self.assertRedirects(response, f'/bookings/confirmation/{booking.pk}/', fetch_redirect_response=False)
+        self.assertTrue(self.client.session[PIN_SESSION_KEY])
+
+        confirmation = self.client.get(response['Location'])
+        self.assertContains(confirmation, self.land.name)
+        self.assertEqual(self.search_reads(), {None})
+
+
+    @override_settings(SEARCH_CACHE_SECONDS=60)
+    def test_replica_search_pages_are_not_cached(self):
+        cache.clear()
+        self.assertEqual(self.search_reads(), {'default'})
+        # Still rendered from the replica: nothing was stored for the version
+        self.assertEqual(self.search_reads(), {'default'})
+        self.assertEqual(search_cache_stats()['hits'], 0)
+
+    def test_index_is_built_from_the_primary(self):
+        request = RequestFactory().get('/bookings/search/')
+        request.session = {}
+        index = OccupancyIndex(timezone.now().date())
+
+        replica_reads(lambda request: index.load())(request)
+
+        self.assertEqual(RecordingRouter.reads, [])
+
+    @override_settings(DATABASE_REPLICA=None)
+    def test_session_is_not_loaded_without_a_replica(self):
+        request = RequestFactory().get('/bookings/search/')
+        request.session = mock.Mock()
+
+        replica_reads(lambda request: Land.objects.count())(request)
+
+        request.session.get.assert_not_called()
+        self.assertEqual(RecordingRouter.reads, [None])
@@ -3,7 +3,9 @@ from . import views
 
 urlpatterns = [
     path('search/', views.search_availability, name='search_availability'),
+    path('search/flexible/', views.flexible_search, name='flexible_search'),
     path('book/<int:land_id>/', views.booking_form, name='booking_form'),
+    path('book/group/', views.group_booking, name='group_booking'),
     path('confirmation/<int:booking_id>/', views.booking_confirmation, name='booking_confirmation'),
     path('calendar/<int:land_id>/', views.land_availability_calendar, name='land_availability_calendar'),
 ]
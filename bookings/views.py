@@ -1,20 +1,97 @@
+import hashlib
+import time
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse
+from django.urls import reverse
 from django.contrib import messages
 from django.utils import timezone
 from django.db.models import Q
 from datetime import datetime, timedelta, date
 from calendar import monthcalendar, month_name
+from campland.asyncviews import aget_object_or_404, arender, async_condition
+from campland.replica import reading_from_replica, replica_reads
 from lands.models import Land
 from .models import Booking, PriceSetting
+from .availability import (
+    availability_stamp,
+    find_flexible_availability,
+    is_land_available,
+    is_land_held,
+    occupied_nights,
+    overlapping_bookings,
+    split_lands_by_availability,
+)
+from .cache import get_cached_search, search_cache_key, search_cache_timeout, search_versions, set_cached_search
+from .reservations import BookingUnavailable, create_booking, create_group_booking, place_hold
 
 
-def search_availability(request):
+def _session_holder(request):
+    """Session key identifying the guest for booking holds"""
+    if not request.session.session_key:
+        request.session.save()
+    return request.session.session_key
+
+
+def _is_personal_page(request):
+    """
+    Check if a page is specific to this guest and must not be shared.
+
+    Pages carrying flash messages, or built for a guest who holds a plot
+    (their own hold is not counted against them), are personal.
+    """
+    if len(messages.get_messages(request)):
+        return True
+    hold_until = request.session.get('hold_until') if request.session.session_key else None
+    return bool(hold_until and hold_until > timezone.now().timestamp())
+
+
+def _can_use_search_cache(request):
+    """Check if a search may be served from or stored in the shared cache"""
+    return bool(search_cache_timeout()) and not _is_personal_page(request)
+
+
+def _make_etag(*parts):
+    """Build an ETag value from version stamp parts"""
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _search_etag(request):
+    """
+    ETag for a search page.
+
+    With the search cache on, it is built from the versions the cache key
+    uses, so revalidating runs no availability queries; it also rolls over
+    as often as cached pages expire, which bounds how long expired holds
+    linger. Without the cache, the versions may not be shared between
+    workers, so the availability stamp of the dates is used instead.
+    """
+    try:
+        check_in = datetime.strptime(request.GET.get('check_in', ''), '%Y-%m-%d').date()
+        check_out = datetime.strptime(request.GET.get('check_out', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+    if check_out <= check_in or _is_personal_page(request):
+        return None
+    timeout = search_cache_timeout()
+    if timeout:
+        stamp = (*search_versions(), int(time.time() // timeout))
+    else:
+        stamp = availability_stamp(check_in, check_out)
+    return _make_etag('search', timezone.now().date(), request.GET.urlencode(), *stamp)
+
+
+@replica_reads
+@async_condition(etag_func=_search_etag)
+async def search_availability(request):
     """Search for available camping plots"""
     available_lands = []
     booked_lands = []
     check_in = None
     check_out = None
     total_nights = 0
+    use_cache = False
+    cache_key = None
     
     if request.GET.get('check_in') and request.GET.get('check_out'):
         check_in_str = request.GET.get('check_in')
@@ -30,29 +107,25 @@ def search_availability(request):
             elif check_in < timezone.now().date():
                 messages.error(request, 'Check-in date cannot be in the past.')
             else:
+                # Serve repeat searches from the cache until availability changes
+                use_cache = await sync_to_async(_can_use_search_cache)(request)
+                if use_cache:
+                    cache_key = await sync_to_async(search_cache_key)(check_in, check_out)
+                    content = await sync_to_async(get_cached_search)(cache_key)
+                    if content is not None:
+                        return HttpResponse(content)
+                
                 # Calculate nights
                 total_nights = (check_out - check_in).days
                 
-                # Get all available lands
-                all_lands = Land.objects.filter(status='available')
-                
-                # Separate lands into available and booked
-                for land in all_lands:
-                    # Check if there are any overlapping bookings
-                    overlapping_bookings = Booking.objects.filter(
-                        land=land,
-                        status__in=['pending', 'confirmed'],
-                        check_in__lt=check_out,
-                        check_out__gt=check_in
-                    ).exists()
-                    
-                    if not overlapping_bookings:
-                        available_lands.append(land)
-                    else:
-                        booked_lands.append(land)
+                # Separate lands into available and booked in one query
+                available_lands, booked_lands = await sync_to_async(split_lands_by_availability)(
+                    check_in, check_out, holder=request.session.session_key
+                )
                 
                 if not available_lands and not booked_lands:
                     messages.info(request, 'No camping plots found. Please try different dates.')
+                    use_cache = False
         
         except ValueError:
             messages.error(request, 'Invalid date format. Please use the date picker.')
@@ -66,7 +139,78 @@ def search_availability(request):
         'today': timezone.now().date(),
     }
     
-    return render(request, 'bookings/search.html', context)
+    response = await arender(request, 'bookings/search.html', context)
+    # A lagging replica may not have the bookings the key's version counts
+    if use_cache and not reading_from_replica():
+        await sync_to_async(set_cached_search)(cache_key, response.content)
+    return response
+
+
+# Longest window a flexible search may scan
+MAX_FLEXIBLE_WINDOW_DAYS = 92
+
+
+async def flexible_search(request):
+    """Search for any N consecutive free nights inside a date window"""
+    results = []
+    window_start = None
+    window_end = None
+    nights = None
+    guests = None
+    today = timezone.now().date()
+    
+    if request.GET.get('window_start') and request.GET.get('window_end') and request.GET.get('nights'):
+        try:
+            window_start = datetime.strptime(request.GET.get('window_start'), '%Y-%m-%d').date()
+            window_end = datetime.strptime(request.GET.get('window_end'), '%Y-%m-%d').date()
+            nights = int(request.GET.get('nights'))
+            guests = int(request.GET.get('guests') or 0) or None
+            
+            if nights < 1:
+                messages.error(request, 'Please stay at least one night.')
+            elif window_end <= window_start:
+                messages.error(request, 'The end of the window must be after its start.')
+            elif window_end < today:
+                messages.error(request, 'The date window is in the past.')
+            elif (window_end - window_start).days > MAX_FLEXIBLE_WINDOW_DAYS:
+                messages.error(
+                    request,
+                    f'Please choose a window of at most {MAX_FLEXIBLE_WINDOW_DAYS} days.'
+                )
+            else:
+                search_start = max(window_start, today)
+                matches = await sync_to_async(find_flexible_availability)(
+                    search_start, window_end, nights, capacity=guests,
+                    holder=request.session.session_key
+                )
+                results = [
+                    {
+                        'land': land,
+                        'start_dates': [
+                            {'check_in': start, 'check_out': start + timedelta(days=nights)}
+                            for start in start_dates
+                        ],
+                    }
+                    for land, start_dates in matches
+                    if start_dates
+                ]
+                
+                if not results:
+                    messages.info(request, 'No camping plots are free for that many nights in this window.')
+        
+        except ValueError:
+            messages.error(request, 'Invalid search. Please check the dates and number of nights.')
+    
+    context = {
+        'results': results,
+        'window_start': window_start,
+        'window_end': window_end,
+        'nights': nights,
+        'guests': guests,
+        'today': today,
+    }
+    
+    return await arender(request, 'bookings/flexible_search.html', context)
 
 
 def booking_form(request, land_id):
@@ -98,17 +242,26 @@ def booking_form(request, land_id):
         return redirect('search_availability')
     
     # Check availability
-    overlapping_bookings = Booking.objects.filter(
-        land=land,
-        status__in=['pending', 'confirmed'],
-        check_in__lt=check_out,
-        check_out__gt=check_in
-    ).exists()
-    
-    if overlapping_bookings:
+    if not is_land_available(land, check_in, check_out):
         messages.error(request, 'This plot is no longer available for the selected dates.')
         return redirect('search_availability')
     
+    # Hold the plot while the guest fills in the form
+    holder = _session_holder(request)
+    if request.method == 'GET':
+        try:
+            hold = place_hold(land, check_in, check_out, holder)
+        except BookingUnavailable as e:
+            messages.error(request, str(e))
+            return redirect('search_availability')
+        request.session['hold_until'] = hold.expires_at.timestamp()
+    elif is_land_held(land, check_in, check_out, holder=holder):
+        messages.error(
+            request,
+            'Another guest is completing a booking for this plot. Please try again in a few minutes.'
+        )
+        return redirect('search_availability')
+    
     total_nights = (check_out - check_in).days
     price_per_night = land.price_per_night  # Use plot's price instead of global price
     total_price = price_per_night * total_nights
@@ -139,19 +292,24 @@ def booking_form(request, land_id):
                     f'Number of guests ({number_of_guests}) exceeds plot capacity ({land.capacity}).'
                 )
             else:
-                # Create booking
-                booking = Booking.objects.create(
-                    land=land,
-                    guest_name=guest_name,
-                    guest_email=guest_email,
-                    guest_phone='',  # We'll store additional info in special_requests
-                    number_of_guests=number_of_guests,
-                    check_in=check_in,
-                    check_out=check_out,
-                    price_per_night=price_per_night,
-                    special_requests=special_requests,
-                    status='pending'
-                )
+                # Create booking, re-checking availability under a lock
+                try:
+                    booking = create_booking(
+                        land,
+                        check_in,
+                        check_out,
+                        holder=holder,
+                        guest_name=guest_name,
+                        guest_email=guest_email,
+                        guest_phone='',  # We'll store additional info in special_requests
+                        number_of_guests=number_of_guests,
+                        price_per_night=price_per_night,
+                        special_requests=special_requests,
+                        status='pending'
+                    )
+                except BookingUnavailable as e:
+                    messages.error(request, str(e))
+                    return redirect('search_availability')
                 
                 messages.success(
                     request,
@@ -175,55 +333,166 @@ def booking_form(request, land_id):
     return render(request, 'bookings/booking_form.html', context)
 
 
-def booking_confirmation(request, booking_id):
-    """Booking confirmation page"""
-    booking = get_object_or_404(Booking, id=booking_id)
-    
-    context = {
-        'booking': booking,
-    }
-    
-    return render(request, 'bookings/confirmation.html', context)
+# Most plots one group booking may cover
+MAX_GROUP_PLOTS = 20
 
 
-def land_availability_calendar(request, land_id):
-    """Display availability calendar for a specific land"""
-    land = get_object_or_404(Land, id=land_id, status='available')
+def group_booking(request):
+    """Book several plots for the same dates in one request"""
+    params = request.POST if request.method == 'POST' else request.GET
+    check_in_str = params.get('check_in')
+    check_out_str = params.get('check_out')
     
-    # Get month and year from request or use current
-    year = int(request.GET.get('year', timezone.now().year))
-    month = int(request.GET.get('month', timezone.now().month))
+    if not check_in_str or not check_out_str:
+        messages.error(request, 'Please select check-in and check-out dates.')
+        return redirect('search_availability')
     
-    # Handle month navigation
-    if month < 1:
-        month = 12
-        year -= 1
-    elif month > 12:
-        month = 1
-        year += 1
+    try:
+        check_in = datetime.strptime(check_in_str, '%Y-%m-%d').date()
+        check_out = datetime.strptime(check_out_str, '%Y-%m-%d').date()
+        land_ids = sorted({int(land_id) for land_id in params.getlist('lands')})
+    except ValueError:
+        messages.error(request, 'Invalid booking request.')
+        return redirect('search_availability')
     
-    # Get calendar data
-    cal = monthcalendar(year, month)
+    search_url = f"{reverse('search_availability')}?check_in={check_in_str}&check_out={check_out_str}"
     
-    # Get all bookings for this land
-    bookings = Booking.objects.filter(
-        land=land,
-        status__in=['pending', 'confirmed']
-    )
+    # Validate dates
+    if check_out <= check_in:
+        messages.error(request, 'Check-out date must be after check-in date.')
+        return redirect('search_availability')
     
-    # Create a set of booked dates
-    booked_dates = set()
-    for booking in bookings:
-        current_date = booking.check_in
-        while current_date < booking.check_out:
-            booked_dates.add(current_date)
-            current_date += timedelta(days=1)
+    if check_in < timezone.now().date():
+        messages.error(request, 'Check-in date cannot be in the past.')
+        return redirect('search_availability')
     
-    # Enhance calendar with status info
+    if len(land_ids) < 2:
+        messages.error(request, 'Please select at least two plots for a group booking.')
+        return redirect(search_url)
+    
+    if len(land_ids) > MAX_GROUP_PLOTS:
+        messages.error(request, f'A group booking can include at most {MAX_GROUP_PLOTS} plots.')
+        return redirect(search_url)
+    
+    lands = list(Land.objects.filter(id__in=land_ids, status='available'))
+    if len(lands) != len(land_ids):
+        messages.error(request, 'Some of the selected plots are no longer available.')
+        return redirect(search_url)
+    
+    total_nights = (check_out - check_in).days
+    for land in lands:
+        land.total_price = land.price_per_night * total_nights
+    total_price = sum(land.total_price for land in lands)
+    min_capacity = min(land.capacity for land in lands)
+    
+    if request.method == 'POST':
+        first_name = request.POST.get('first_name')
+        last_name = request.POST.get('last_name')
+        guest_email = request.POST.get('guest_email')
+        number_of_persons = request.POST.get('number_of_persons')
+        event_summary = request.POST.get('event_summary', '')
+        
+        special_requests = f"Group booking of {len(lands)} plots\n"
+        special_requests += f"Event Type: {event_summary}"
+        
+        try:
+            number_of_guests = int(number_of_persons)
+            
+            # Validate capacity
+            if number_of_guests > min_capacity:
+                messages.error(
+                    request,
+                    f'Number of guests per plot ({number_of_guests}) exceeds the smallest plot capacity ({min_capacity}).'
+                )
+            else:
+                try:
+                    bookings = create_group_booking(
+                        lands,
+                        check_in,
+                        check_out,
+                        holder=request.session.session_key,
+                        guest_name=f"{first_name} {last_name}",
+                        guest_email=guest_email,
+                        guest_phone='',
+                        number_of_guests=number_of_guests,
+                        special_requests=special_requests,
+                        status='pending'
+                    )
+                except BookingUnavailable as e:
+                    messages.error(request, str(e))
+                    return redirect(search_url)
+                
+                booking_ids = ', '.join(str(booking.id) for booking in bookings)
+                messages.success(
+                    request,
+                    f'Group booking request for {len(bookings)} plots submitted successfully! '
+                    f'Booking IDs: {booking_ids}. We will contact you soon to confirm your reservation.'
+                )
+                return redirect('booking_confirmation', booking_id=bookings[0].id)
+        
+        except (ValueError, TypeError):
+            messages.error(request, 'Invalid number of guests.')
+    
+    context = {
+        'lands': lands,
+        'check_in': check_in,
+        'check_out': check_out,
+        'total_nights': total_nights,
+        'total_price': total_price,
+        'min_capacity': min_capacity,
+    }
+    
+    return render(request, 'bookings/group_booking_form.html', context)
+
+
+def _confirmation_stamp(request, booking_id):
+    """Update times of a booking and its land, or None for personal pages"""
+    if not hasattr(request, '_confirmation_stamp'):
+        request._confirmation_stamp = None if _is_personal_page(request) else Booking.objects.filter(
+            id=booking_id
+        ).values_list('updated_at', 'land__updated_at').first()
+    return request._confirmation_stamp
+
+
+def _confirmation_etag(request, booking_id):
+    """ETag for a confirmation page, from the booking's updated_at"""
+    stamp = _confirmation_stamp(request, booking_id)
+    return _make_etag('confirmation', booking_id, *stamp) if stamp else None
+
+
+def _confirmation_last_modified(request, booking_id):
+    """Last-Modified for a confirmation page"""
+    stamp = _confirmation_stamp(request, booking_id)
+    return max(stamp) if stamp else None
+
+
+@async_condition(etag_func=_confirmation_etag, last_modified_func=_confirmation_last_modified)
+async def booking_confirmation(request, booking_id):
+    """Booking confirmation page"""
+    booking = await aget_object_or_404(Booking.objects.select_related('land'), id=booking_id)
+    
+    context = {
+        'booking': booking,
+    }
+    
+    return await arender(request, 'bookings/confirmation.html', context)
+
+
+# Number of months the calendar can show on one page
+CALENDAR_MONTH_CHOICES = [1, 3, 6, 12]
+
+
+def _add_months(year, month, count):
+    """Return (year, month) shifted by count months"""
+    index = year * 12 + (month - 1) + count
+    return index // 12, index % 12 + 1
+
+
+def _enhance_month(year, month, occupied, offset, today):
+    """Build calendar weeks for a month from a slice of the occupancy array"""
     enhanced_cal = []
-    today = timezone.now().date()
     
-    for week in cal:
+    for week in monthcalendar(year, month):
         enhanced_week = []
         for day in week:
             if day == 0:
@@ -236,7 +505,7 @@ def land_availability_calendar(request, land_id):
                 })
             else:
                 current_date = date(year, month, day)
-                is_booked = current_date in booked_dates
+                is_booked = bool(occupied[offset + day - 1])
                 is_past = current_date < today
                 
                 status = 'past' if is_past else 'booked' if is_booked else 'available'
@@ -250,15 +519,90 @@ def land_availability_calendar(request, land_id):
                 })
         enhanced_cal.append(enhanced_week)
     
+    return enhanced_cal
+
+
+def _calendar_range(request):
+    """Parse year, month and number of months to display from the request"""
+    # Get month and year from request or use current
+    year = int(request.GET.get('year', timezone.now().year))
+    month = int(request.GET.get('month', timezone.now().month))
+    
+    # Handle month navigation
+    if month < 1:
+        month = 12
+        year -= 1
+    elif month > 12:
+        month = 1
+        year += 1
+    
+    # Number of months to display
+    try:
+        month_count = int(request.GET.get('months', 1))
+    except ValueError:
+        month_count = 1
+    if month_count not in CALENDAR_MONTH_CHOICES:
+        month_count = 1
+    
+    return year, month, month_count
+
+
+def _calendar_etag(request, land_id):
+    """ETag for a calendar page, from the land's booking stamp for the range"""
+    try:
+        year, month, month_count = _calendar_range(request)
+        range_start = date(year, month, 1)
+        range_end = date(*_add_months(year, month, month_count), 1)
+    except ValueError:
+        return None
+    return _make_etag(
+        'calendar', land_id, timezone.now().date(), year, month, month_count,
+        *availability_stamp(range_start, range_end, land_id=land_id, include_holds=False)
+    )
+
+
+@replica_reads
+@async_condition(etag_func=_calendar_etag)
+async def land_availability_calendar(request, land_id):
+    """Display availability calendar for a specific land"""
+    land = await aget_object_or_404(Land, id=land_id, status='available')
+    year, month, month_count = _calendar_range(request)
+    
+    # Get bookings for this land that overlap the displayed months
+    range_start = date(year, month, 1)
+    range_end = date(*_add_months(year, month, month_count), 1)
+    intervals = [
+        interval async for interval in overlapping_bookings(range_start, range_end).filter(
+            land=land
+        ).values_list('check_in', 'check_out')
+    ]
+    
+    # Mark booked nights by clipping each booking to the displayed range
+    occupied = occupied_nights(intervals, range_start, range_end)
+    
+    # Enhance calendar with status info
+    today = timezone.now().date()
+    months = []
+    for i in range(month_count):
+        month_year, month_number = _add_months(year, month, i)
+        offset = (date(month_year, month_number, 1) - range_start).days
+        months.append({
+            'year': month_year,
+            'month': month_number,
+            'month_name': month_name[month_number],
+            'enhanced_cal': _enhance_month(month_year, month_number, occupied, offset, today),
+        })
+    
     # Navigation dates
-    prev_month = month - 1 if month > 1 else 12
-    prev_year = year if month > 1 else year - 1
-    next_month = month + 1 if month < 12 else 1
-    next_year = year if month < 12 else year + 1
+    prev_year, prev_month = _add_months(year, month, -month_count)
+    next_year, next_month = _add_months(year, month, month_count)
     
     context = {
         'land': land,
-        'enhanced_cal': enhanced_cal,
+        'months': months,
+        'month_count': month_count,
+        'month_count_choices': CALENDAR_MONTH_CHOICES,
+        'enhanced_cal': months[0]['enhanced_cal'],
         'month': month,
         'year': year,
         'current_year': year,
@@ -270,4 +614,4 @@ def land_availability_calendar(request, land_id):
         'today': today,
     }
     
-    return render(request, 'bookings/availability_calendar.html', context)
\ No newline at end of file
+    return await arender(request, 'bookings/availability_calendar.html', context)
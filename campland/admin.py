@@ -1,9 +1,20 @@
 from django.contrib import admin
-from django.db.models import Sum, Count, Q, Avg, F
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils.decorators import method_decorator
 from datetime import timedelta, datetime
 from django.utils import timezone
-from lands.models import Land
-from bookings.models import Booking, PriceSetting
+from bookings.availability import GRID_STATES, build_occupancy_grid
+from bookings.cache import search_cache_stats
+from .profiling import list_profiles, profile_file
+from .replica import replica_reads
+from .widgets import WIDGETS, get_widget
+
+
+# Longest date range the occupancy grid may cover
+MAX_GRID_DAYS = 366
 
 
 class DashboardAdminSite(admin.AdminSite):
@@ -12,117 +23,129 @@ class DashboardAdminSite(admin.AdminSite):
     site_title = "RIVIÈRE RV PARK Admin"
     index_title = "Dashboard & Analytics"
     
-    def index(self, request, extra_context=None):
-        """Override admin index to include dashboard analytics"""
-        
-        # Calculate analytics
+    def get_urls(self):
+        """Add dashboard views to the admin URLs"""
+        urls = [
+            path(
+                'occupancy-grid/',
+                self.admin_view(self.occupancy_grid_view),
+                name='occupancy_grid'
+            ),
+            path(
+                'occupancy-grid/data/',
+                self.admin_view(self.occupancy_grid_data),
+                name='occupancy_grid_data'
+            ),
+            path(
+                'dashboard/<slug:name>/',
+                self.admin_view(self.dashboard_widget_view),
+                name='dashboard_widget'
+            ),
+            path(
+                'search-cache/',
+                self.admin_view(self.search_cache_view),
+                name='search_cache'
+            ),
+            path(
+                'profiles/',
+                self.admin_view(self.profiles_view),
+                name='profiles'
+            ),
+            path(
+                'profiles/<slug:profile_id>.html',
+                self.admin_view(self.profile_detail_view),
+                name='profile_detail'
+            ),
+            path(
+                'profiles/<slug:profile_id>.prof',
+                self.admin_view(self.profile_download_view),
+                name='profile_download'
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def _grid_range(self, request):
+        """Parse the start date and number of days for the occupancy grid"""
         today = timezone.now().date()
-        last_30_days = today - timedelta(days=30)
-        last_90_days = today - timedelta(days=90)
-        
-        # Overall Statistics
-        total_bookings = Booking.objects.count()
-        total_lands = Land.objects.count()
-        total_revenue = Booking.objects.filter(status__in=['confirmed', 'completed']).aggregate(Sum('total_price'))['total_price__sum'] or 0
-        pending_bookings = Booking.objects.filter(status='pending').count()
-        
-        # Booking Status Distribution
-        status_distribution = Booking.objects.values('status').annotate(count=Count('id')).order_by('status')
-        
-        # Land Status Distribution
-        land_status = Land.objects.values('status').annotate(count=Count('id')).order_by('status')
-        
-        # Recent Bookings (last 10)
-        recent_bookings = Booking.objects.select_related('land').order_by('-created_at')[:10]
-        
-        # Last 30 Days Bookings
-        bookings_last_30 = Booking.objects.filter(created_at__gte=last_30_days)
-        bookings_30_count = bookings_last_30.count()
-        revenue_30 = bookings_last_30.filter(status__in=['confirmed', 'completed']).aggregate(Sum('total_price'))['total_price__sum'] or 0
-        
-        # Last 90 Days Bookings
-        bookings_last_90 = Booking.objects.filter(created_at__gte=last_90_days)
-        bookings_90_count = bookings_last_90.count()
-        revenue_90 = bookings_last_90.filter(status__in=['confirmed', 'completed']).aggregate(Sum('total_price'))['total_price__sum'] or 0
-        
-        # Occupancy Rate
-        total_land_days = total_lands * 30  # 30 days
-        booked_nights = Booking.objects.filter(
-            status__in=['pending', 'confirmed', 'completed'],
-            check_in__gte=last_30_days
-        ).aggregate(Sum('total_nights'))['total_nights__sum'] or 0
-        occupancy_rate = (booked_nights / total_land_days * 100) if total_land_days > 0 else 0
-        
-        # Average Booking Value
-        avg_booking_value = Booking.objects.filter(status__in=['confirmed', 'completed']).aggregate(Avg('total_price'))['total_price__avg'] or 0
-        avg_booking_nights = Booking.objects.aggregate(Avg('total_nights'))['total_nights__avg'] or 0
-        
-        # Top Performing Lands (by bookings)
-        top_lands = Land.objects.annotate(
-            booking_count=Count('bookings')
-        ).order_by('-booking_count')[:5]
-        
-        # Top Lands by Revenue
-        top_lands_revenue = Land.objects.annotate(
-            total_revenue=Sum('bookings__total_price')
-        ).filter(total_revenue__isnull=False).order_by('-total_revenue')[:5]
-        
-        # Upcoming Bookings (next 30 days)
-        upcoming_bookings = Booking.objects.filter(
-            check_in__gte=today,
-            check_in__lte=today + timedelta(days=30),
-            status__in=['pending', 'confirmed']
-        ).select_related('land').order_by('check_in')[:10]
-        
-        # Booking Timeline Data (for charts) - Last 30 days
-        booking_timeline = []
-        for i in range(30, -1, -1):
-            date = today - timedelta(days=i)
-            count = Booking.objects.filter(created_at__date=date).count()
-            booking_timeline.append({
-                'date': date.strftime('%m-%d'),
-                'count': count
-            })
-        
-        # Revenue Timeline Data (for charts) - Last 30 days
-        revenue_timeline = []
-        for i in range(30, -1, -1):
-            date = today - timedelta(days=i)
-            rev = Booking.objects.filter(
-                created_at__date=date,
-                status__in=['confirmed', 'completed']
-            ).aggregate(Sum('total_price'))['total_price__sum'] or 0
-            revenue_timeline.append({
-                'date': date.strftime('%m-%d'),
-                'revenue': float(rev)
-            })
-        
-        # Prepare extra context with analytics data
-        analytics_context = {
-            'total_bookings': total_bookings,
-            'total_lands': total_lands,
-            'total_revenue': float(total_revenue),
-            'pending_bookings': pending_bookings,
-            'status_distribution': list(status_distribution),
-            'land_status': list(land_status),
-            'recent_bookings': recent_bookings,
-            'upcoming_bookings': upcoming_bookings,
-            'bookings_30_count': bookings_30_count,
-            'revenue_30': float(revenue_30),
-            'bookings_90_count': bookings_90_count,
-            'revenue_90': float(revenue_90),
-            'occupancy_rate': round(occupancy_rate, 2),
-            'avg_booking_value': float(avg_booking_value),
-            'avg_booking_nights': round(avg_booking_nights, 2),
-            'top_lands': top_lands,
-            'top_lands_revenue': top_lands_revenue,
-            'booking_timeline': booking_timeline,
-            'revenue_timeline': revenue_timeline,
-            'today': today,
+        try:
+            start = datetime.strptime(request.GET.get('start', ''), '%Y-%m-%d').date()
+        except ValueError:
+            start = today
+        try:
+            days = int(request.GET.get('days', 30))
+        except ValueError:
+            days = 30
+        days = min(max(days, 1), MAX_GRID_DAYS)
+        return start, days
+    
+    def occupancy_grid_view(self, request):
+        """Park-wide plots x days occupancy grid"""
+        start, days = self._grid_range(request)
+        context = {
+            **self.each_context(request),
+            'title': 'Occupancy Grid',
+            'start': start,
+            'days': days,
+            'states': GRID_STATES,
+        }
+        return TemplateResponse(request, 'admin/occupancy_grid.html', context)
+    
+    @method_decorator(replica_reads)
+    def occupancy_grid_data(self, request):
+        """Occupancy grid as JSON"""
+        start, days = self._grid_range(request)
+        grid = build_occupancy_grid(start, start + timedelta(days=days))
+        return JsonResponse(grid.as_dict())
+    
+    def search_cache_view(self, request):
+        """Search cache hit/miss counters as JSON"""
+        return JsonResponse(search_cache_stats())
+    
+    def profiles_view(self, request):
+        """Stored request profiles, newest first"""
+        context = {
+            **self.each_context(request),
+            'title': 'Request Profiles',
+            'profiles': list_profiles(),
+            'enabled': getattr(settings, 'REQUEST_PROFILING_ENABLED', False),
+            'keep': getattr(settings, 'REQUEST_PROFILING_KEEP', 50),
         }
+        return TemplateResponse(request, 'admin/profiles.html', context)
+    
+    def profile_detail_view(self, request, profile_id):
+        """HTML summary of one stored profile"""
+        path = profile_file(profile_id, '.html')
+        if path is None:
+            raise Http404('Unknown profile')
+        return HttpResponse(path.read_text())
+    
+    def profile_download_view(self, request, profile_id):
+        """Raw cProfile output of one stored profile"""
+        path = profile_file(profile_id, '.prof')
+        if path is None:
+            raise Http404('Unknown profile')
+        return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
+    
+    @method_decorator(replica_reads)
+    def dashboard_widget_view(self, request, name):
+        """One dashboard widget as JSON"""
+        if name not in WIDGETS:
+            raise Http404('Unknown dashboard widget')
+        return JsonResponse(get_widget(name, timezone.now().date()))
+    
+    @method_decorator(replica_reads)
+    def index(self, request, extra_context=None):
+        """
+        Override admin index to include the analytics dashboard.
         
+        Only the page skeleton is rendered here; the widgets are fetched in
+        parallel from dashboard_widget_view once the page has loaded.
+        """
         if extra_context is None:
             extra_context = {}
-        extra_context.update(analytics_context)
+        extra_context.update({
+            'dashboard_widgets': list(WIDGETS),
+            'today': timezone.now().date(),
+        })
         
         return super().index(request, extra_context=extra_context)
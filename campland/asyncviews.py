@@ -0,0 +1,49 @@
+"""
+Helpers for the async views served under ASGI.
+
+Template rendering, sessions and flash messages are synchronous in Django,
+and the context processors may touch the session or the user, so pages are
+rendered in the request's worker thread with arender(). The ORM queries a
+view needs are awaited in the view itself.
+"""
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import render
+from django.views.decorators.http import condition
+
+
+arender = sync_to_async(render)
+
+
+async def aget_object_or_404(klass, **kwargs):
+    """Async get_object_or_404 for a model, manager or queryset"""
+    queryset = getattr(klass, '_default_manager', klass)
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """
+    django.views.decorators.http.condition for async views.
+
+    The ETag and Last-Modified functions of this project query the database
+    and the session, so they run in a worker thread before the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag = await sync_to_async(etag_func)(request, *args, **kwargs) if etag_func else None
+            last_modified = (
+                await sync_to_async(last_modified_func)(request, *args, **kwargs)
+                if last_modified_func else None
+            )
+            conditional = condition(
+                etag_func=lambda *a, **kw: etag,
+                last_modified_func=lambda *a, **kw: last_modified,
+            )(view)
+            return await conditional(request, *args, **kwargs)
+        return inner
+    return decorator
@@ -0,0 +1,102 @@
+"""
+Data layer for the admin analytics dashboard.
+
+Booking figures are read from the daily statistics rollups maintained by
+bookings.rollups, so each function runs a fixed number of small queries
+regardless of how many bookings exist.
+"""
+from datetime import timedelta
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+from bookings.models import DailyBookingStats
+from bookings.rollups import STATUS_COUNTERS
+from lands.models import Land
+
+
+def _ratio(total, count):
+    return float(total) / count if count else 0
+
+
+def booking_summary(today):
+    """Overall, 30-day and 90-day booking counts and revenue in one query"""
+    last_30 = Q(date__gte=today - timedelta(days=30))
+    last_90 = Q(date__gte=today - timedelta(days=90))
+
+    aggregates = {
+        'total_bookings': Sum('bookings_count'),
+        'total_revenue': Sum('revenue'),
+        'revenue_bookings': Sum('revenue_bookings'),
+        'total_nights': Sum('total_nights'),
+        'bookings_30_count': Sum('bookings_count', filter=last_30),
+        'revenue_30': Sum('revenue', filter=last_30),
+        'bookings_90_count': Sum('bookings_count', filter=last_90),
+        'revenue_90': Sum('revenue', filter=last_90),
+    }
+    for field in STATUS_COUNTERS.values():
+        aggregates[field] = Sum(field)
+    summary = {
+        key: value or 0
+        for key, value in DailyBookingStats.objects.aggregate(**aggregates).items()
+    }
+
+    return {
+        'total_bookings': summary['total_bookings'],
+        'pending_bookings': summary['pending_count'],
+        'total_revenue': float(summary['total_revenue']),
+        'avg_booking_value': _ratio(summary['total_revenue'], summary['revenue_bookings']),
+        'avg_booking_nights': round(_ratio(summary['total_nights'], summary['total_bookings']), 2),
+        'bookings_30_count': summary['bookings_30_count'],
+        'revenue_30': float(summary['revenue_30']),
+        'bookings_90_count': summary['bookings_90_count'],
+        'revenue_90': float(summary['revenue_90']),
+        'status_distribution': [
+            {'status': status, 'count': summary[field]}
+            for status, field in sorted(STATUS_COUNTERS.items())
+            if summary[field]
+        ],
+    }
+
+
+def daily_timelines(today, days=30):
+    """
+    Bookings created and revenue per day for the last `days` days and today.
+
+    Both timelines come from one range scan of the daily rollup; days without
+    bookings are zero-filled here.
+    """
+    start = today - timedelta(days=days)
+    rows = DailyBookingStats.objects.filter(
+        date__gte=start,
+        date__lte=today
+    ).values('date', 'bookings_count', 'revenue')
+    by_day = {row['date']: row for row in rows}
+
+    booking_timeline = []
+    revenue_timeline = []
+    for i in range(days, -1, -1):
+        date = today - timedelta(days=i)
+        row = by_day.get(date, {})
+        booking_timeline.append({
+            'date': date.strftime('%m-%d'),
+            'count': row.get('bookings_count', 0)
+        })
+        revenue_timeline.append({
+            'date': date.strftime('%m-%d'),
+            'revenue': float(row.get('revenue') or 0)
+        })
+    return booking_timeline, revenue_timeline
+
+
+def top_lands(limit=5):
+    """Lands with the most bookings, from the per-land running totals"""
+    return Land.objects.annotate(
+        booking_count=Coalesce('stats__bookings_count', 0)
+    ).order_by('-booking_count')[:limit]
+
+
+def top_lands_by_revenue(limit=5):
+    """Lands with the highest booking value, from the per-land running totals"""
+    return Land.objects.annotate(
+        total_revenue=F('stats__total_value'),
+        booking_count=F('stats__bookings_count')
+    ).filter(booking_count__gt=0).order_by('-total_revenue')[:limit]
@@ -0,0 +1,265 @@
+"""
+Per-URL-name request metrics in Prometheus text format.
+
+Each process aggregates histograms in memory. When REQUEST_METRICS_DIR is
+set, every process also writes its totals to its own JSON file in that
+directory (at most once per REQUEST_METRICS_FLUSH_SECONDS, and at exit),
+and the /metrics view sums the files of all processes, so the figures
+cover every gunicorn worker whichever one serves the scrape. Files of
+workers that have exited are kept so totals stay monotonic; the directory
+is cleared when gunicorn starts (see gunicorn.conf.py).
+
+Database connections are reported per alias: connections opened (which
+stays flat while persistent or pooled connections are reused) and, with
+DB_POOL, the size, idle connections and waiting requests of each worker's
+pool. Gauges are summed over the workers that are still running, so
+db_pool_max_size is the most connections the server may be asked for.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+
+# Upper bounds in seconds of the histogram buckets; +Inf is implied
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HISTOGRAMS = {
+    'request_duration_seconds': 'Total time spent handling the request',
+    'request_db_seconds': 'Time spent executing database queries',
+    'request_template_seconds': 'Time spent rendering templates',
+}
+COUNTERS = {
+    'request_queries_total': 'Database queries executed',
+    'requests_total': 'Requests handled',
+    'db_connections_opened_total': 'Database connections opened',
+    'db_pool_requests_queued_total': 'Pool connection requests that had to wait',
+    'db_pool_wait_seconds_total': 'Time spent waiting for a pool connection',
+}
+GAUGES = {
+    'db_pool_size': 'Connections held by the pool, idle or in use',
+    'db_pool_available': 'Idle connections in the pool',
+    'db_pool_max_size': 'Most connections the pool may hold',
+    'db_pool_requests_waiting': 'Requests waiting for a pool connection',
+}
+METRIC_PREFIX = 'campland_'
+
+
+def metrics_dir():
+    """Directory shared by the worker processes, or None for in-process metrics"""
+    path = getattr(settings, 'REQUEST_METRICS_DIR', None)
+    return Path(path) if path else None
+
+
+def _empty_histogram():
+    return {'buckets': [0] * (len(DURATION_BUCKETS) + 1), 'sum': 0.0, 'count': 0}
+
+
+def _bucket_index(value):
+    for index, bound in enumerate(DURATION_BUCKETS):
+        if value <= bound:
+            return index
+    return len(DURATION_BUCKETS)
+
+
+def _pooled(alias):
+    return bool(connections.settings[alias].get('OPTIONS', {}).get('pool'))
+
+
+def pool_stats():
+    """Gauges and running totals of this process's connection pools, by alias"""
+    gauges = {name: {} for name in GAUGES}
+    counters = {
+        'db_connections_opened_total': {},
+        'db_pool_requests_queued_total': {},
+        'db_pool_wait_seconds_total': {},
+    }
+    for alias in connections:
+        if not _pooled(alias):
+            continue
+        pool = connections[alias].pool
+        if pool.closed:
+            # Not used by this process yet
+            continue
+        stats = pool.get_stats()
+        gauges['db_pool_size'][alias] = stats.get('pool_size', 0)
+        gauges['db_pool_available'][alias] = stats.get('pool_available', 0)
+        gauges['db_pool_max_size'][alias] = stats.get('pool_max', 0)
+        gauges['db_pool_requests_waiting'][alias] = stats.get('requests_waiting', 0)
+        counters['db_connections_opened_total'][alias] = stats.get('connections_num', 0)
+        counters['db_pool_requests_queued_total'][alias] = stats.get('requests_queued', 0)
+        counters['db_pool_wait_seconds_total'][alias] = stats.get('requests_wait_ms', 0) / 1000
+    return gauges, {name: values for name, values in counters.items() if values}
+
+
+class MetricsRegistry:
+    """Histograms and counters of this process, keyed by URL name"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {'histograms': {}, 'counters': {}}
+        self.last_flush = 0.0
+
+    def observe(self, view, total, db, template, queries, status):
+        """Record one request"""
+        with self.lock:
+            for name, value in (
+                ('request_duration_seconds', total),
+                ('request_db_seconds', db),
+                ('request_template_seconds', template),
+            ):
+                histogram = self.data['histograms'].setdefault(name, {}).setdefault(view, _empty_histogram())
+                histogram['buckets'][_bucket_index(value)] += 1
+                histogram['sum'] += value
+                histogram['count'] += 1
+            counters = self.data['counters']
+            queries_by_view = counters.setdefault('request_queries_total', {})
+            queries_by_view[view] = queries_by_view.get(view, 0) + queries
+            requests_by_view = counters.setdefault('requests_total', {})
+            key = f'{view}|{status // 100}xx'
+            requests_by_view[key] = requests_by_view.get(key, 0) + 1
+        self.maybe_flush()
+
+    def connection_opened(self, alias):
+        """Count a new database connection"""
+        with self.lock:
+            opened = self.data['counters'].setdefault('db_connections_opened_total', {})
+            opened[alias] = opened.get(alias, 0) + 1
+
+    def snapshot(self):
+        gauges, pool_counters = pool_stats()
+        with self.lock:
+            data = json.loads(json.dumps(self.data))
+        data['gauges'] = gauges
+        data['counters'].update(pool_counters)
+        return data
+
+    def maybe_flush(self, force=False):
+        """Write this process's totals to the shared directory if it is time to"""
+        directory = metrics_dir()
+        if directory is None:
+            return
+        interval = getattr(settings, 'REQUEST_METRICS_FLUSH_SECONDS', 1.0)
+        now = time.monotonic()
+        if not force and now - self.last_flush < interval:
+            return
+        self.last_flush = now
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as tmp:
+            json.dump(self.snapshot(), tmp)
+        os.replace(tmp_path, directory / f'metrics-{os.getpid()}.json')
+
+
+registry = MetricsRegistry()
+atexit.register(lambda: registry.maybe_flush(force=True))
+
+
+@receiver(connection_created)
+def _count_connection(sender, connection, **kwargs):
+    # Pooled aliases report the pool's own count: Django signals every checkout
+    if not _pooled(connection.alias):
+        registry.connection_opened(connection.alias)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merge(total, part, gauges=True):
+    for name, views in part.get('histograms', {}).items():
+        for view, histogram in views.items():
+            merged = total['histograms'].setdefault(name, {}).setdefault(view, _empty_histogram())
+            merged['buckets'] = [a + b for a, b in zip(merged['buckets'], histogram['buckets'])]
+            merged['sum'] += histogram['sum']
+            merged['count'] += histogram['count']
+    for name, values in part.get('counters', {}).items():
+        merged = total['counters'].setdefault(name, {})
+        for key, value in values.items():
+            merged[key] = merged.get(key, 0) + value
+    if gauges:
+        for name, values in part.get('gauges', {}).items():
+            merged = total['gauges'].setdefault(name, {})
+            for key, value in values.items():
+                merged[key] = merged.get(key, 0) + value
+
+
+def collect():
+    """Histograms and counters merged over every process, gauges over the running ones"""
+    total = {'histograms': {}, 'counters': {}, 'gauges': {}}
+    directory = metrics_dir()
+    if directory is None:
+        _merge(total, registry.snapshot())
+        return total
+    registry.maybe_flush(force=True)
+    for path in directory.glob('metrics-*.json'):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            # Unreadable or vanished file; skip it for this scrape
+            continue
+        pid = int(path.stem.split('-', 1)[1])
+        _merge(total, snapshot, gauges=_alive(pid))
+    return total
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(metrics):
+    """Prometheus text exposition format"""
+    lines = []
+    for name, help_text in HISTOGRAMS.items():
+        metric = METRIC_PREFIX + name
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+        for view, histogram in sorted(metrics['histograms'].get(name, {}).items()):
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS + ('+Inf',), histogram['buckets']):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{view="{_label(view)}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{view="{_label(view)}"}} {histogram["sum"]:.6f}')
+            lines.append(f'{metric}_count{{view="{_label(view)}"}} {histogram["count"]}')
+    for name, help_text in COUNTERS.items():
+        metric = METRIC_PREFIX + name
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+        for key, value in sorted(metrics['counters'].get(name, {}).items()):
+            if name == 'requests_total':
+                view, status = key.rsplit('|', 1)
+                labels = f'view="{_label(view)}",status="{status}"'
+            elif name.startswith('db_'):
+                labels = f'database="{_label(key)}"'
+            else:
+                labels = f'view="{_label(key)}"'
+            lines.append(f'{metric}{{{labels}}} {value}')
+    for name, help_text in GAUGES.items():
+        metric = METRIC_PREFIX + name
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+        for alias, value in sorted(metrics.get('gauges', {}).get(name, {}).items()):
+            lines.append(f'{metric}{{database="{_label(alias)}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Prometheus metrics for all workers; staff only"""
+    if not (request.user.is_active and request.user.is_staff):
+        return HttpResponseForbidden('Staff only')
+    return HttpResponse(
+        render_prometheus(collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
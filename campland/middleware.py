@@ -0,0 +1,120 @@
+"""
+Request instrumentation.
+
+RequestMetricsMiddleware times each request, the database queries it runs
+(through connection.execute_wrapper on every database alias) and the
+templates it renders (through the TimedDjangoTemplates backend in
+campland.templating). The totals go out in a Server-Timing header and into
+the per-URL-name histograms served by campland.metrics. The middleware
+runs in sync (WSGI) and async (ASGI) handler chains.
+"""
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from .metrics import registry
+
+
+_current_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Time and query counters of the current request"""
+
+    def __init__(self):
+        self.db = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+
+@contextmanager
+def template_timer():
+    """
+    Count the block as template time of the current request, if it is measured.
+
+    Only the outermost render is timed; templates rendered inside it (for
+    example with render_to_string in a tag) are not counted twice.
+    """
+    timings = _current_timings.get()
+    if timings is None or timings.template_depth:
+        yield
+        return
+    timings.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.template += time.perf_counter() - started
+        timings.template_depth -= 1
+
+
+@contextmanager
+def _measure():
+    """Time the queries and template renders of the block on every database"""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timings))
+            yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+class RequestMetricsMiddleware:
+    """Record total, database and template time of every request"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with _measure() as timings:
+            response = self.get_response(request)
+            # Lazy responses (TemplateResponse) are rendered by now
+        return self._record(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        with _measure() as timings:
+            response = await self.get_response(request)
+        return self._record(request, response, timings, time.perf_counter() - started)
+
+    def _record(self, request, response, timings, total):
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"',
+            f'tpl;dur={timings.template * 1000:.1f}',
+        ])
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        registry.observe(view, total, timings.db, timings.template, timings.queries, response.status_code)
+        return response
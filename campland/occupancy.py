@@ -0,0 +1,105 @@
+"""
+Occupancy analytics for the admin dashboard.
+
+Booked nights are laid out as one bytearray per plot, one byte per night.
+Each booking is clipped to the window and written with a single slice
+assignment, and rates are taken with bytearray.count(), so no Python loop
+runs per night. Plots under maintenance are left out of both the booked
+nights and the available plot-nights.
+"""
+from datetime import timedelta
+from bookings.availability import occupied_nights
+from bookings.models import Booking
+from lands.models import Land
+
+
+# Booking statuses that occupy a plot
+OCCUPIED_STATUSES = ['pending', 'confirmed', 'completed']
+
+
+class PlotOccupancy:
+    """Booked nights per plot for nights in [start, end)"""
+
+    def __init__(self, start, end, lands, nights):
+        self.start = start
+        self.end = end
+        self.lands = lands
+        self.nights = nights
+
+    def _offsets(self, start, end):
+        first = max((start - self.start).days, 0)
+        last = min((end - self.start).days, (self.end - self.start).days)
+        return first, max(last, first)
+
+    def booked_nights(self, start, end, land_id=None):
+        """Booked nights in [start, end), for one plot or all of them"""
+        first, last = self._offsets(start, end)
+        rows = [self.nights[land_id]] if land_id is not None else self.nights.values()
+        return sum(row.count(1, first, last) for row in rows)
+
+    def rate(self, start, end, land_id=None):
+        """Percentage of plot-nights booked in [start, end)"""
+        first, last = self._offsets(start, end)
+        plots = 1 if land_id is not None else len(self.lands)
+        capacity = plots * (last - first)
+        if not capacity:
+            return 0
+        return self.booked_nights(start, end, land_id) / capacity * 100
+
+    def weekly_heatmap(self, weeks_start, weeks):
+        """Plots x weeks table of occupancy rates"""
+        week_starts = [weeks_start + timedelta(weeks=i) for i in range(weeks)]
+        rows = []
+        for land in self.lands:
+            cells = []
+            for week_start in week_starts:
+                rate = self.rate(week_start, week_start + timedelta(days=7), land['id'])
+                cells.append({
+                    'rate': round(rate),
+                    'opacity': round(rate / 100, 2),
+                })
+            rows.append({'name': land['name'], 'cells': cells})
+        return {
+            'weeks': [week_start.strftime('%m-%d') for week_start in week_starts],
+            'rows': rows,
+        }
+
+
+def load_plot_occupancy(start, end):
+    """Booked nights in [start, end) for every plot not under maintenance, in two queries"""
+    lands = list(
+        Land.objects.exclude(status='maintenance').order_by('name', 'id').values('id', 'name')
+    )
+    intervals = {land['id']: [] for land in lands}
+    bookings = Booking.objects.filter(
+        status__in=OCCUPIED_STATUSES,
+        check_in__lt=end,
+        check_out__gt=start
+    ).exclude(land__status='maintenance').values_list('land_id', 'check_in', 'check_out')
+    for land_id, check_in, check_out in bookings:
+        if land_id in intervals:
+            intervals[land_id].append((check_in, check_out))
+
+    nights = {
+        land_id: occupied_nights(land_intervals, start, end)
+        for land_id, land_intervals in intervals.items()
+    }
+    return PlotOccupancy(start, end, lands, nights)
+
+
+def dashboard_occupancy(today, days=30, weeks=12):
+    """
+    Occupancy rate over the last `days` nights and a weekly heatmap.
+
+    The heatmap covers `weeks` Monday-aligned weeks ending with the current
+    one; both figures come from one load.
+    """
+    window_start = today - timedelta(days=days)
+    weeks_start = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+    weeks_end = weeks_start + timedelta(weeks=weeks)
+
+    occupancy = load_plot_occupancy(min(window_start, weeks_start), max(today, weeks_end))
+    return {
+        'occupancy_rate': round(occupancy.rate(window_start, today), 2),
+        'occupancy_heatmap': occupancy.weekly_heatmap(weeks_start, weeks),
+    }
@@ -0,0 +1,185 @@
+"""
+Opt-in profiling of single requests for staff.
+
+When REQUEST_PROFILING_ENABLED is set, a staff user can add ?_profile=1 to
+any URL (or send an X-Profile: 1 header) to run that one request under
+cProfile. The raw profile is stored as <id>.prof (open it with pstats or
+snakeviz) next to an HTML summary of the top cumulative frames and a small
+JSON record of the request. Only the newest REQUEST_PROFILING_KEEP profiles
+are kept, so the directory stays bounded while the hook is left enabled.
+The profiles are listed in the admin under /admin/profiles/.
+
+cProfile follows a single thread. The middleware is sync, so while
+profiling it hands the rest of the request to sync_to_async from an event
+loop of its own: async views reached through async_to_sync then run on that
+loop, whose thread is profiled too, and both profiles are merged. Under ASGI
+the loop is the server's, so the profile can include other requests it
+served meanwhile.
+"""
+import cProfile
+import json
+import os
+import pstats
+import secrets
+import tempfile
+import time
+from pathlib import Path
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
+# Frames listed in the HTML summary
+TOP_FRAMES = 40
+
+
+def profiles_dir():
+    """Directory holding the stored profiles"""
+    return Path(getattr(settings, 'REQUEST_PROFILING_DIR', None) or Path(tempfile.gettempdir()) / 'campland_profiles')
+
+
+def profile_requested(request):
+    """Whether the request asks to be profiled and comes from an active staff user"""
+    asked = request.GET.get(PROFILE_PARAM) or request.headers.get(PROFILE_HEADER)
+    if not asked or asked in ('0', 'false'):
+        return False
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+def _frame_name(key):
+    """'path:line(function)' with the project or site-packages prefix removed"""
+    filename, line, function = key
+    if filename == '~':
+        # Built-in functions have no source file
+        return function
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        filename = filename[len(base):]
+    elif 'site-packages' + os.sep in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    return f'{filename}:{line}({function})'
+
+
+def top_frames(stats, limit=TOP_FRAMES):
+    """The `limit` frames with the most cumulative time, as dicts"""
+    total = stats.total_tt or 1
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'frame': _frame_name(key),
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'own_ms': round(own * 1000, 2),
+            'cumulative_ms': round(cumulative * 1000, 2),
+            'share': round(min(cumulative / total, 1) * 100, 1),
+        }
+        for key, (primitive_calls, calls, own, cumulative, _callers) in rows
+    ]
+
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as tmp:
+        tmp.write(data)
+    os.replace(tmp_path, path)
+
+
+def save_profile(profilers, request, response, elapsed):
+    """Store the merged raw profile, its HTML summary and the request record; return the id"""
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    now = timezone.now()
+    # Ids sort in creation order, which the retention policy relies on
+    profile_id = f'{now:%Y%m%d-%H%M%S-%f}-{secrets.token_hex(2)}'
+
+    for profiler in profilers:
+        profiler.create_stats()
+    stats = pstats.Stats(*[profiler for profiler in profilers if profiler.stats])
+    record = {
+        'id': profile_id,
+        'created_at': now.isoformat(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'user': request.user.get_username(),
+        'total_ms': round(elapsed * 1000, 1),
+        'function_calls': stats.total_calls,
+    }
+
+    stats.dump_stats(str(directory / f'{profile_id}.prof'))
+    html = render_to_string('admin/profile_summary.html', {**record, 'frames': top_frames(stats)})
+    _write_atomic(directory / f'{profile_id}.html', html.encode())
+    # The record is written last: a profile is listed only once it is complete
+    _write_atomic(directory / f'{profile_id}.json', json.dumps(record).encode())
+
+    prune_profiles(directory)
+    return profile_id
+
+
+def prune_profiles(directory=None, keep=None):
+    """Delete all but the newest `keep` profiles"""
+    directory = directory or profiles_dir()
+    keep = keep if keep is not None else getattr(settings, 'REQUEST_PROFILING_KEEP', 50)
+    records = sorted(directory.glob('*.json'), reverse=True)
+    for record in records[keep:]:
+        for suffix in ('.json', '.html', '.prof'):
+            record.with_suffix(suffix).unlink(missing_ok=True)
+
+
+def list_profiles():
+    """Records of the stored profiles, newest first"""
+    directory = profiles_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in sorted(directory.glob('*.json'), reverse=True):
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # Pruned by another process while listing
+            continue
+    return profiles
+
+
+def profile_file(profile_id, suffix):
+    """Path of one stored profile file, or None if it does not exist"""
+    path = profiles_dir() / f'{profile_id}{suffix}'
+    return path if path.is_file() else None
+
+
+class RequestProfilingMiddleware:
+    """Profile single requests of staff users; REQUEST_PROFILING_ENABLED turns it on"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profile_requested(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        loop_profiler = cProfile.Profile()
+        started = time.perf_counter()
+        response = profiler.runcall(async_to_sync(self.profile_loop), request, loop_profiler)
+        elapsed = time.perf_counter() - started
+
+        profile_id = save_profile([profiler, loop_profiler], request, response, elapsed)
+        response['X-Profile-Id'] = profile_id
+        response['X-Profile-Url'] = reverse('admin:profile_detail', args=[profile_id])
+        return response
+
+    async def profile_loop(self, request, loop_profiler):
+        """Run the request from an event loop profiled by `loop_profiler`, where async views run"""
+        loop_profiler.enable()
+        try:
+            return await sync_to_async(self.get_response)(request)
+        finally:
+            loop_profiler.disable()
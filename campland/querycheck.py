@@ -0,0 +1,164 @@
+"""
+N+1 and slow query detection.
+
+QueryInspector is a database execute wrapper that fingerprints every query
+by its normalized shape (literals, parameters and IN lists replaced) and
+remembers where in the project it was issued. A shape repeated more than
+QUERY_CHECK_REPEAT_THRESHOLD times, or a query slower than
+QUERY_CHECK_SLOW_MS, is reported as a problem: logged as a warning, or
+raised as QueryCheckError when QUERY_CHECK_ACTION is 'raise'.
+
+QueryCheckMiddleware inspects each request when QUERY_CHECK_ENABLED is set;
+query_check() inspects any block of code, such as a test.
+"""
+import logging
+import re
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger('campland.querycheck')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryCheckError(Exception):
+    """Raised for repeated or slow queries when QUERY_CHECK_ACTION is 'raise'"""
+
+
+def fingerprint(sql):
+    """Shape of a query with literals and parameter lists normalized"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+# Execute wrappers whose frames sit between the ORM and this module
+_WRAPPER_FILES = {
+    str(Path(__file__).resolve()),
+    str(Path(__file__).with_name('middleware.py').resolve()),
+}
+
+
+def _call_site():
+    """Innermost project frame outside the execute wrappers, as 'path:line in function'"""
+    base = str(Path(settings.BASE_DIR).resolve())
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = str(Path(frame.filename).resolve())
+        if (
+            filename.startswith(base)
+            and 'site-packages' not in filename
+            and filename not in _WRAPPER_FILES
+        ):
+            return f'{Path(filename).relative_to(base)}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+class QueryInspector:
+    """Execute wrapper that groups queries by shape and times them"""
+
+    def __init__(self, repeat_threshold=None, slow_ms=None):
+        self.repeat_threshold = (
+            repeat_threshold if repeat_threshold is not None
+            else getattr(settings, 'QUERY_CHECK_REPEAT_THRESHOLD', 5)
+        )
+        self.slow_ms = slow_ms if slow_ms is not None else getattr(settings, 'QUERY_CHECK_SLOW_MS', 100)
+        self.shapes = {}
+        self.slow = []
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.count += 1
+            shape = fingerprint(sql)
+            entry = self.shapes.get(shape)
+            if entry is None:
+                self.shapes[shape] = entry = {'count': 0, 'call_site': _call_site()}
+            entry['count'] += 1
+            if self.slow_ms and elapsed_ms > self.slow_ms:
+                self.slow.append({'sql': shape, 'ms': round(elapsed_ms, 1), 'call_site': _call_site()})
+
+    def problems(self):
+        """Readable descriptions of repeated and slow queries"""
+        found = [
+            f"Query repeated {entry['count']} times (threshold {self.repeat_threshold}) "
+            f"at {entry['call_site']}: {shape}"
+            for shape, entry in self.shapes.items()
+            if entry['count'] > self.repeat_threshold
+        ]
+        found += [
+            f"Slow query ({query['ms']} ms, limit {self.slow_ms} ms) at {query['call_site']}: {query['sql']}"
+            for query in self.slow
+        ]
+        return found
+
+
+@contextmanager
+def inspect_queries(repeat_threshold=None, slow_ms=None):
+    """Inspect the queries run inside the block on every database"""
+    inspector = QueryInspector(repeat_threshold, slow_ms)
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(inspector))
+        yield inspector
+
+
+def report(problems, label, action=None):
+    """Log or raise the problems found while running `label`"""
+    if not problems:
+        return
+    action = action or getattr(settings, 'QUERY_CHECK_ACTION', 'warn')
+    message = f'{label}:\n  ' + '\n  '.join(problems)
+    if action == 'raise':
+        raise QueryCheckError(message)
+    logger.warning(message)
+
+
+@contextmanager
+def query_check(label='Query check', repeat_threshold=None, slow_ms=None, action=None):
+    """Inspect the block and report repeated or slow queries when it ends"""
+    with inspect_queries(repeat_threshold, slow_ms) as inspector:
+        yield inspector
+    report(inspector.problems(), label, action)
+
+
+class QueryCheckMiddleware:
+    """Report N+1 patterns and slow queries per request; QUERY_CHECK_ENABLED turns it on"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_CHECK_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with inspect_queries() as inspector:
+            response = self.get_response(request)
+        report(inspector.problems(), f'{request.method} {request.path}')
+        return response
+
+    async def __acall__(self, request):
+        with inspect_queries() as inspector:
+            response = await self.get_response(request)
+        report(inspector.problems(), f'{request.method} {request.path}')
+        return response
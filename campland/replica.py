@@ -0,0 +1,132 @@
+"""
+Read replica routing.
+
+With DATABASE_REPLICA_URL set, the views decorated with replica_reads (the
+availability search, the plot calendars and the admin dashboard) read from
+the replica alias; everything else, and every write, uses the primary.
+
+A replica lags behind the primary, so a guest who has just booked must not
+be shown the replica's older state. PrimaryPinMiddleware notes when a
+request writes bookings or plots and pins the session to the primary: from
+then on, replica_reads leaves the session's reads on the primary too.
+
+The routing flag is a context variable, so it follows the async views into
+the worker threads their queries run in.
+"""
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Session key set once the session has written to the primary
+PIN_SESSION_KEY = 'db_pinned_to_primary'
+# Apps whose writes the session must be able to read back
+PINNING_APPS = {'bookings', 'lands'}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_request_writes = ContextVar('request_writes', default=None)
+
+
+def _mirrors_primary(alias):
+    """Whether the alias points at the primary database itself, as in tests"""
+    if alias == DEFAULT_DB_ALIAS:
+        return False
+    replica = connections[alias].settings_dict
+    primary = connections[DEFAULT_DB_ALIAS].settings_dict
+    return all(replica[key] == primary[key] for key in ('NAME', 'HOST', 'PORT'))
+
+
+def replica_alias():
+    """Database alias of the replica, or None when none is configured"""
+    alias = getattr(settings, 'DATABASE_REPLICA', None)
+    if alias and _mirrors_primary(alias):
+        return None
+    return alias
+
+
+def reading_from_replica():
+    """Whether the current view's reads go to the replica"""
+    return bool(_replica_reads.get() and replica_alias())
+
+
+class ReplicaRouter:
+    """Send the reads of replica_reads views to the replica, all writes to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        writes = _request_writes.get()
+        if writes is not None and model._meta.app_label in PINNING_APPS:
+            writes.add(model._meta.label)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+
+def replica_reads(view):
+    """Read from the replica in the view unless the session is pinned to the primary"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            # Loaded here, so the session itself is read from the primary;
+            # without a replica the session is not loaded at all
+            use_replica = bool(replica_alias()) and not await request.session.aget(PIN_SESSION_KEY, False)
+            token = _replica_reads.set(use_replica)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+    else:
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            use_replica = bool(replica_alias()) and not request.session.get(PIN_SESSION_KEY, False)
+            token = _replica_reads.set(use_replica)
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+    return inner
+
+
+class PrimaryPinMiddleware:
+    """Pin sessions that wrote bookings or plots to the primary; needs DATABASE_REPLICA_URL"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_alias():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request_writes.set(set())
+        try:
+            response = self.get_response(request)
+            if _request_writes.get() and not request.session.get(PIN_SESSION_KEY):
+                request.session[PIN_SESSION_KEY] = True
+        finally:
+            _request_writes.reset(token)
+        return response
+
+    async def __acall__(self, request):
+        token = _request_writes.set(set())
+        try:
+            response = await self.get_response(request)
+            if _request_writes.get() and not await request.session.aget(PIN_SESSION_KEY):
+                await request.session.aset(PIN_SESSION_KEY, True)
+        finally:
+            _request_writes.reset(token)
+        return response
@@ -14,6 +14,7 @@ import os
 import dj_database_url
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -57,12 +58,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'campland.middleware.RequestMetricsMiddleware',
+    'campland.querycheck.QueryCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'campland.replica.PrimaryPinMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'campland.profiling.RequestProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,7 +76,8 @@ ROOT_URLCONF = 'campland.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to the request metrics
+        'BACKEND': 'campland.templating.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,23 +92,182 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'campland.wsgi.application'
+# Async serving mode (SERVER_MODE=asgi)
+ASGI_APPLICATION = 'campland.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Serving mode of start_server.sh and gunicorn.conf.py: 'wsgi' or 'asgi'
+SERVER_MODE = config('SERVER_MODE', default='wsgi')
+# gunicorn threads per sync worker (WEB_CONCURRENCY sets the worker processes)
+WEB_THREADS = config('WEB_THREADS', default=1, cast=int)
+
+# Persistent connections: seconds a connection is kept for the next request
+# (0 closes it after each request). Under ASGI each request runs in its own
+# thread and cannot reuse them, so use DB_POOL there instead.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=0 if SERVER_MODE == 'asgi' else 600, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
+# PostgreSQL connection pool per worker process (needs psycopg[pool], psycopg 3).
+# A sync worker uses at most one connection per thread; an ASGI worker one per
+# request in flight. The server sees up to WEB_CONCURRENCY x DB_POOL_MAX_SIZE.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=1, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=10 if SERVER_MODE == 'asgi' else WEB_THREADS, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10.0, cast=float)
+
 # Use PostgreSQL in production, SQLite in development
 if config('DATABASE_URL', default=None):
     DATABASES = {
-        'default': dj_database_url.parse(config('DATABASE_URL'))
+        'default': dj_database_url.parse(
+            config('DATABASE_URL'),
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
+        )
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+        }
+    }
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # File-backed test database: connections to an in-memory one share a
+    # cache and fail with "table is locked" instead of waiting for locks,
+    # which the concurrent booking tests rely on
+    DATABASES['default'].setdefault('TEST', {}).setdefault('NAME', BASE_DIR / 'test_db.sqlite3')
+
+# Optional read replica of the primary database. When set, the availability
+# search, the plot calendars and the admin dashboard read from it (see
+# campland/replica.py); every write goes to the primary, and a session that
+# has written bookings or plots reads from the primary from then on.
+# For local testing, point it at a copy of the SQLite file or at a second
+# PostgreSQL database restored from the primary.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default=None)
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+    # Tests run against the primary's test database only
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['campland.replica.ReplicaRouter']
+DATABASE_REPLICA = 'replica' if DATABASE_REPLICA_URL else None
+
+if DB_POOL and any(database['ENGINE'] == 'django.db.backends.postgresql' for database in DATABASES.values()):
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured('DB_POOL needs psycopg 3 with the pool extra: pip install "psycopg[binary,pool]"')
+
+for database in DATABASES.values():
+    if DB_POOL and database['ENGINE'] == 'django.db.backends.postgresql':
+        # The pool replaces persistent connections; with health checks on,
+        # Django has it check each connection before handing it out
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': min(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE),
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        }
+
+# SQLite production profile for small single-host deployments: WAL so reads
+# never wait for the writer, synchronous=NORMAL (durable with WAL), memory-
+# mapped reads and a larger page cache, and a busy timeout. Transactions
+# begin IMMEDIATE, taking the write lock up front where the busy timeout
+# applies, instead of failing with "database is locked" when a read
+# transaction later tries to write.
+SQLITE_TUNED = config('SQLITE_TUNED', default=False, cast=bool)
+SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int)
+# Negative values are KiB, positive values pages
+SQLITE_CACHE_SIZE = config('SQLITE_CACHE_SIZE', default=-64000, cast=int)
+# Well inside gunicorn's 30 s worker timeout
+SQLITE_BUSY_TIMEOUT_MS = config('SQLITE_BUSY_TIMEOUT_MS', default=10000, cast=int)
+
+for database in DATABASES.values():
+    if not SQLITE_TUNED or database['ENGINE'] != 'django.db.backends.sqlite3':
+        continue
+    database.setdefault('OPTIONS', {}).update({
+        'init_command': ';'.join([
+            # First, so switching the journal mode also waits for locks
+            f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}',
+            'PRAGMA journal_mode=WAL',
+            'PRAGMA synchronous=NORMAL',
+            f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}',
+            f'PRAGMA cache_size={SQLITE_CACHE_SIZE}',
+        ]),
+        'transaction_mode': 'IMMEDIATE',
+    })
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Use a file-based cache when several gunicorn workers must share state
+if config('CACHE_LOCATION', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_LOCATION'),
         }
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# In-process per-plot occupancy index (see bookings/occupancy_index.py)
+AVAILABILITY_INDEX_ENABLED = config('AVAILABILITY_INDEX_ENABLED', default=False, cast=bool)
+
+# How long opening the booking form holds a plot for the guest
+BOOKING_HOLD_MINUTES = config('BOOKING_HOLD_MINUTES', default=10, cast=int)
+
+# How long rendered search results are cached (0 disables the cache). Off by
+# default without CACHE_LOCATION: a per-process cache misses the bookings
+# made through the other workers
+SEARCH_CACHE_SECONDS = config('SEARCH_CACHE_SECONDS', default=60 if config('CACHE_LOCATION', default=None) else 0, cast=int)
+
+# How long the rendered home, about and rules pages are cached (0 disables
+# the cache); entries are per day, see core/cache.py
+PAGE_CACHE_SECONDS = config('PAGE_CACHE_SECONDS', default=3600, cast=int)
+
+# Request instrumentation: Server-Timing header and /metrics (see campland/metrics.py).
+# Set REQUEST_METRICS_DIR to share the metrics between gunicorn workers.
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+REQUEST_METRICS_DIR = config('REQUEST_METRICS_DIR', default=None)
+REQUEST_METRICS_FLUSH_SECONDS = config('REQUEST_METRICS_FLUSH_SECONDS', default=1.0, cast=float)
+
+# N+1 and slow query detection per request (see campland/querycheck.py);
+# QUERY_CHECK_ACTION is 'warn' (log) or 'raise'
+QUERY_CHECK_ENABLED = config('QUERY_CHECK_ENABLED', default=False, cast=bool)
+QUERY_CHECK_ACTION = config('QUERY_CHECK_ACTION', default='warn')
+QUERY_CHECK_REPEAT_THRESHOLD = config('QUERY_CHECK_REPEAT_THRESHOLD', default=5, cast=int)
+QUERY_CHECK_SLOW_MS = config('QUERY_CHECK_SLOW_MS', default=100, cast=int)
+
+# Staff-only profiling of single requests with ?_profile=1 (see campland/profiling.py);
+# only the newest REQUEST_PROFILING_KEEP profiles are kept on disk
+REQUEST_PROFILING_ENABLED = config('REQUEST_PROFILING_ENABLED', default=False, cast=bool)
+REQUEST_PROFILING_DIR = config('REQUEST_PROFILING_DIR', default=None)
+REQUEST_PROFILING_KEEP = config('REQUEST_PROFILING_KEEP', default=50, cast=int)
+
+# Admin dashboard widget cache timeouts, e.g. "kpis=60,bookings=0" (see campland/widgets.py)
+DASHBOARD_WIDGET_CACHE_SECONDS = config(
+    'DASHBOARD_WIDGET_CACHE_SECONDS',
+    default='',
+    cast=lambda value: {
+        name.strip(): int(seconds)
+        for name, seconds in (item.split('=') for item in value.split(',') if item.strip())
+    }
+)
 
 
 # Password validation
@@ -0,0 +1,28 @@
+"""
+Django template backend that reports render time to the request metrics.
+
+Templates loaded through TimedDjangoTemplates time their render calls into
+the request measured by RequestMetricsMiddleware; outside a measured request
+they render as usual. Includes and extends render inside the outer template
+and are part of its time.
+"""
+from django.template.backends.django import DjangoTemplates, Template
+from .middleware import template_timer
+
+
+class TimedTemplate(Template):
+    """Backend template whose renders count as template time"""
+
+    def render(self, context=None, request=None):
+        with template_timer():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates returning TimedTemplate"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -0,0 +1,38 @@
+"""Test helpers shared by the apps"""
+from contextlib import contextmanager
+from .querycheck import inspect_queries
+
+
+# Serve static files without a collectstatic manifest in tests
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+class QueryBudgetMixin:
+    """
+    Query budgets for TestCase classes.
+
+    assertQueryBudget fails when the block runs more than `max_queries`
+    queries or repeats one query shape more than `repeat_threshold` times,
+    listing each shape with the call site that issued it.
+    """
+
+    query_repeat_threshold = 3
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries, repeat_threshold=None):
+        threshold = self.query_repeat_threshold if repeat_threshold is None else repeat_threshold
+        with inspect_queries(repeat_threshold=threshold, slow_ms=0) as inspector:
+            yield inspector
+
+        if inspector.count > max_queries:
+            shapes = '\n  '.join(
+                f"{entry['count']}x at {entry['call_site']}: {shape}"
+                for shape, entry in inspector.shapes.items()
+            )
+            self.fail(f'{inspector.count} queries run, budget {max_queries}:\n  {shapes}')
+        problems = inspector.problems()
+        if problems:
+            self.fail('\n'.join(problems))
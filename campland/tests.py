@@ -0,0 +1,316 @@
+import json
+import os
+import pstats
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.template.base import Template
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from bookings.models import Booking
+from bookings.rollups import rebuild_stats
+from lands.models import Land
+from .metrics import collect, registry, render_prometheus
+from .occupancy import load_plot_occupancy
+from .profiling import list_profiles
+from .querycheck import QueryCheckError, fingerprint, query_check
+from .testing import TEST_STORAGES, QueryBudgetMixin
+
+
+@override_settings(STORAGES=TEST_STORAGES, DASHBOARD_WIDGET_CACHE_SECONDS={'timelines': 0})
+class DashboardQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """The admin dashboard must run a fixed number of queries"""
+
+    # The index only renders the skeleton: session and user lookups
+    index_query_budget = 2
+    # Session and user lookups plus the widget's own queries
+    widget_query_budgets = {
+        'kpis': 4,
+        'timelines': 3,
+        'top-plots': 4,
+        'occupancy': 4,
+        'bookings': 4,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        now = timezone.now()
+        for i in range(3):
+            land = Land.objects.create(
+                name=f'Plot {i}',
+                description='A plot for tests',
+                size=Decimal('100.00'),
+                capacity=4,
+            )
+            for day in range(0, 45, 5):
+                booking = Booking.objects.create(
+                    land=land,
+                    guest_name='Test Guest',
+                    guest_email='guest@example.com',
+                    guest_phone='',
+                    number_of_guests=2,
+                    check_in=now.date() + timedelta(days=day),
+                    check_out=now.date() + timedelta(days=day + 2),
+                    price_per_night=Decimal('50.00'),
+                    status='confirmed' if day % 2 else 'pending',
+                )
+                Booking.objects.filter(pk=booking.pk).update(created_at=now - timedelta(days=day))
+        # The backdating above bypasses the signals that maintain the rollups
+        rebuild_stats()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_index_query_budget(self):
+        with self.assertQueryBudget(self.index_query_budget):
+            response = self.client.get('/admin/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_widget_query_budgets(self):
+        for name, budget in self.widget_query_budgets.items():
+            with self.subTest(widget=name), self.assertQueryBudget(budget):
+                response = self.client.get(f'/admin/dashboard/{name}/')
+            self.assertEqual(response.status_code, 200)
+
+    def test_cached_widget_skips_queries(self):
+        self.client.get('/admin/dashboard/kpis/')
+        with self.assertNumQueries(2):
+            response = self.client.get('/admin/dashboard/kpis/')
+        self.assertEqual(response.json()['total_bookings'], 27)
+
+    def test_unknown_widget(self):
+        response = self.client.get('/admin/dashboard/nope/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_timelines_are_zero_filled(self):
+        data = self.client.get('/admin/dashboard/timelines/').json()
+        booking_timeline = data['booking_timeline']
+        revenue_timeline = data['revenue_timeline']
+
+        self.assertEqual(len(booking_timeline), 31)
+        self.assertEqual(len(revenue_timeline), 31)
+        self.assertEqual(sum(day['count'] for day in booking_timeline), 21)
+        self.assertEqual(booking_timeline[-1]['count'], 3)
+        self.assertEqual(booking_timeline[-2]['count'], 0)
+        self.assertEqual(sum(day['revenue'] for day in revenue_timeline), 900.0)
+
+
+class OccupancyTests(TestCase):
+    """Occupancy counts nights inside the window on plots in service"""
+
+    def make_land(self, name, status='available'):
+        return Land.objects.create(
+            name=name,
+            description='A plot for tests',
+            size=Decimal('100.00'),
+            capacity=4,
+            status=status,
+        )
+
+    def book(self, land, check_in, check_out, status='confirmed'):
+        return Booking.objects.create(
+            land=land,
+            guest_name='Test Guest',
+            guest_email='guest@example.com',
+            guest_phone='',
+            number_of_guests=2,
+            check_in=check_in,
+            check_out=check_out,
+            price_per_night=Decimal('50.00'),
+            status=status,
+        )
+
+    def test_stays_are_clipped_to_window(self):
+        today = date(2026, 6, 30)
+        start = today - timedelta(days=30)
+        plot = self.make_land('Plot A')
+        self.make_land('Plot B')
+        closed = self.make_land('Plot C', status='maintenance')
+
+        # 5 nights before the window, 3 inside it
+        self.book(plot, start - timedelta(days=5), start + timedelta(days=3))
+        # 2 nights inside the window, 4 after it
+        self.book(plot, today - timedelta(days=2), today + timedelta(days=4))
+        self.book(plot, start + timedelta(days=10), start + timedelta(days=12), status='cancelled')
+        self.book(closed, start, today)
+
+        occupancy = load_plot_occupancy(start, today)
+
+        self.assertEqual(occupancy.booked_nights(start, today), 5)
+        self.assertAlmostEqual(occupancy.rate(start, today), 5 / 60 * 100)
+        self.assertEqual([land['name'] for land in occupancy.lands], ['Plot A', 'Plot B'])
+
+    def test_weekly_heatmap(self):
+        monday = date(2026, 6, 1)
+        plot = self.make_land('Plot A')
+        self.book(plot, monday + timedelta(days=5), monday + timedelta(days=9))
+
+        occupancy = load_plot_occupancy(monday, monday + timedelta(weeks=2))
+        heatmap = occupancy.weekly_heatmap(monday, 2)
+
+        self.assertEqual(heatmap['weeks'], ['06-01', '06-08'])
+        self.assertEqual([cell['rate'] for cell in heatmap['rows'][0]['cells']], [29, 29])
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class RequestMetricsTests(TestCase):
+    """Requests are timed and exposed to staff in Prometheus format"""
+
+    def setUp(self):
+        registry.data = {'histograms': {}, 'counters': {}}
+
+    def test_server_timing_header(self):
+        response = self.client.get('/bookings/search/')
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('tpl;dur=', timing)
+        self.assertNotEqual(float(timing.split('tpl;dur=')[1]), 0)
+
+    def test_templates_are_not_patched_globally(self):
+        self.client.get('/bookings/search/')
+        self.assertEqual(Template.render.__module__, 'django.template.base')
+
+    def test_metrics_are_staff_only(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        User.objects.create_user('guest', 'guest@example.com', 'password')
+        self.client.login(username='guest', password='password')
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    def test_metrics_histograms(self):
+        self.client.get('/bookings/search/')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        body = self.client.get('/metrics').content.decode()
+
+        self.assertIn('campland_request_duration_seconds_bucket{view="search_availability",le="+Inf"} 1', body)
+        self.assertIn('campland_request_duration_seconds_count{view="search_availability"} 1', body)
+        self.assertIn('campland_requests_total{view="search_availability",status="2xx"} 1', body)
+
+    def test_shared_directory_merges_workers(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(REQUEST_METRICS_DIR=directory):
+            # Another worker's totals
+            other = {'histograms': {}, 'counters': {'requests_total': {'home|2xx': 4}}}
+            Path(directory, 'metrics-1.json').write_text(json.dumps(other))
+            self.client.get('/')
+
+            metrics = collect()
+
+        self.assertEqual(metrics['counters']['requests_total']['home|2xx'], 5)
+
+    def test_pool_gauges_of_exited_workers_are_dropped(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(REQUEST_METRICS_DIR=directory):
+            pool = {'histograms': {}, 'counters': {}, 'gauges': {'db_pool_max_size': {'default': 4}}}
+            # A running worker (this process's parent) and one that has exited
+            Path(directory, f'metrics-{os.getppid()}.json').write_text(json.dumps(pool))
+            Path(directory, 'metrics-999999999.json').write_text(json.dumps(pool))
+
+            body = render_prometheus(collect())
+
+        self.assertIn('# TYPE campland_db_pool_max_size gauge', body)
+        self.assertIn('campland_db_pool_max_size{database="default"} 4', body)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class QueryCheckTests(QueryBudgetMixin, TestCase):
+    """Repeated query shapes are caught with their call site"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(6):
+            land = Land.objects.create(
+                name=f'Plot {i}',
+                description='A plot for tests',
+                size=Decimal('100.00'),
+                capacity=4,
+            )
+            Booking.objects.create(
+                land=land,
+                guest_name='Test Guest',
+                guest_email='guest@example.com',
+                guest_phone='',
+                number_of_guests=2,
+                check_in=date(2026, 7, 1),
+                check_out=date(2026, 7, 3),
+                price_per_night=Decimal('50.00'),
+            )
+
+    def test_fingerprint_normalizes_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 12 AND name = 'x''y' AND pk IN (%s, %s, %s)"),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND pk IN (...)'
+        )
+
+    def test_n_plus_one_is_reported(self):
+        with self.assertRaises(QueryCheckError) as raised:
+            with query_check(repeat_threshold=3, action='raise'):
+                names = [booking.land.name for booking in Booking.objects.all()]
+        self.assertEqual(len(names), 6)
+        self.assertIn('repeated 6 times', str(raised.exception))
+        self.assertIn('campland/tests.py', str(raised.exception))
+
+    def test_search_query_budget(self):
+        check_in = timezone.now().date() + timedelta(days=10)
+        with self.assertQueryBudget(4):
+            response = self.client.get('/bookings/search/', {
+                'check_in': check_in.isoformat(),
+                'check_out': (check_in + timedelta(days=2)).isoformat(),
+            })
+        self.assertEqual(len(response.context['available_lands']), 6)
+
+
+@override_settings(STORAGES=TEST_STORAGES, REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_KEEP=2)
+class RequestProfilingTests(TestCase):
+    """Staff can profile single requests; profiles are stored with bounded retention"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(REQUEST_PROFILING_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_anonymous_requests_are_not_profiled(self):
+        response = self.client.get('/bookings/search/', {'_profile': 1})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(list_profiles(), [])
+
+    def test_staff_request_is_profiled(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(
+            '/bookings/search/', {'check_in': '2030-07-01', 'check_out': '2030-07-03', '_profile': 1},
+        )
+        profile_id = response['X-Profile-Id']
+
+        self.assertEqual(
+            list_profiles()[0]['path'],
+            '/bookings/search/?check_in=2030-07-01&check_out=2030-07-03&_profile=1',
+        )
+        # The async view runs in the event loop thread of async_to_sync
+        stats = pstats.Stats(str(self.directory / f'{profile_id}.prof'))
+        functions = {function for _filename, _line, function in stats.stats}
+        self.assertIn('search_availability', functions)
+        summary = self.client.get(response['X-Profile-Url'])
+        self.assertContains(summary, 'bookings/views.py')
+        download = self.client.get(f'/admin/profiles/{profile_id}.prof')
+        self.assertEqual(download.status_code, 200)
+        self.assertContains(self.client.get('/admin/profiles/'), profile_id)
+
+    def test_header_triggers_profiling(self):
+        self.client.force_login(self.admin)
+        response = self.client.get('/bookings/search/', headers={'X-Profile': '1'})
+        self.assertIn('X-Profile-Id', response)
+
+    def test_old_profiles_are_pruned(self):
+        self.client.force_login(self.admin)
+        for _ in range(3):
+            self.client.get('/', {'_profile': 1})
+
+        self.assertEqual(len(list_profiles()), 2)
+        self.assertEqual(len(list(self.directory.glob('*.prof'))), 2)
@@ -21,6 +21,7 @@ from django.conf.urls.static import static
 
 # Import models and admin classes
 from campland.admin import DashboardAdminSite
+from campland.metrics import metrics_view
 from lands.models import Land
 from lands.admin import LandAdmin
 from bookings.models import Booking, PriceSetting
@@ -39,6 +40,7 @@ admin_site.register(Group)
 
 urlpatterns = [
     path('admin/', admin_site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('', include('core.urls')),
     path('bookings/', include('bookings.urls')),
 ]
@@ -0,0 +1,121 @@
+"""
+Admin dashboard widgets.
+
+Each widget is an independent JSON payload fetched by the admin index page
+after it has rendered, so a slow aggregate only delays its own widget.
+Payloads are cached per day with a per-widget timeout that can be changed
+with the DASHBOARD_WIDGET_CACHE_SECONDS setting (0 disables caching).
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import dateformat
+from bookings.models import Booking
+from lands.models import Land
+from .dashboard import booking_summary, daily_timelines, top_lands, top_lands_by_revenue
+from .occupancy import dashboard_occupancy
+
+
+# Default cache timeouts in seconds
+WIDGET_CACHE_SECONDS = {
+    'kpis': 60,
+    'timelines': 300,
+    'top-plots': 900,
+    'occupancy': 300,
+    'bookings': 30,
+}
+
+
+def _booking_row(booking):
+    return {
+        'id': booking.id,
+        'guest_name': booking.guest_name,
+        'land': booking.land.name,
+        'check_in': dateformat.format(booking.check_in, 'M d, Y'),
+        'total_price': float(booking.total_price or 0),
+        'total_nights': booking.total_nights,
+        'status': booking.status,
+        'status_display': booking.get_status_display(),
+    }
+
+
+def kpis_widget(today):
+    """Headline figures, status distributions and the plot count"""
+    land_status = list(Land.objects.values('status').annotate(count=Count('id')).order_by('status'))
+    return {
+        **booking_summary(today),
+        'total_lands': sum(row['count'] for row in land_status),
+        'land_status': land_status,
+    }
+
+
+def timelines_widget(today):
+    """Bookings created and revenue per day over the last 30 days"""
+    booking_timeline, revenue_timeline = daily_timelines(today, days=30)
+    return {
+        'booking_timeline': booking_timeline,
+        'revenue_timeline': revenue_timeline,
+    }
+
+
+def top_plots_widget(today):
+    """Plots with the most bookings and the highest booking value"""
+    return {
+        'top_lands': [
+            {'name': land.name, 'booking_count': land.booking_count}
+            for land in top_lands(5)
+        ],
+        'top_lands_revenue': [
+            {'name': land.name, 'total_revenue': float(land.total_revenue)}
+            for land in top_lands_by_revenue(5)
+        ],
+    }
+
+
+def occupancy_widget(today):
+    """Occupancy rate over the last 30 nights and the weekly heatmap"""
+    return dashboard_occupancy(today, days=30, weeks=12)
+
+
+def bookings_widget(today):
+    """Most recent bookings and active bookings checking in within 30 days"""
+    recent = Booking.objects.select_related('land').order_by('-created_at')[:10]
+    upcoming = Booking.objects.filter(
+        check_in__gte=today,
+        check_in__lte=today + timedelta(days=30),
+        status__in=['pending', 'confirmed']
+    ).select_related('land').order_by('check_in')[:10]
+    return {
+        'recent_bookings': [_booking_row(booking) for booking in recent],
+        'upcoming_bookings': [_booking_row(booking) for booking in upcoming],
+    }
+
+
+WIDGETS = {
+    'kpis': kpis_widget,
+    'timelines': timelines_widget,
+    'top-plots': top_plots_widget,
+    'occupancy': occupancy_widget,
+    'bookings': bookings_widget,
+}
+
+
+def widget_cache_timeout(name):
+    """Seconds a widget payload stays cached"""
+    timeouts = getattr(settings, 'DASHBOARD_WIDGET_CACHE_SECONDS', {})
+    return timeouts.get(name, WIDGET_CACHE_SECONDS[name])
+
+
+def get_widget(name, today):
+    """Payload of a dashboard widget, from the cache when possible"""
+    timeout = widget_cache_timeout(name)
+    if not timeout:
+        return WIDGETS[name](today)
+
+    key = f'dashboard:widget:{name}:{today.isoformat()}'
+    data = cache.get(key)
+    if data is None:
+        data = WIDGETS[name](today)
+        cache.set(key, data, timeout)
+    return data
@@ -0,0 +1,199 @@
+"""
+Benchmark harness for the public booking paths and the admin dashboard.
+
+Each dataset size is generated with lands.synthetic into the test database,
+then every scenario is driven through the Django test client. A scenario
+records its median wall time, the queries of one request and the peak
+Python memory of one request (measured in a separate traced run so
+tracemalloc does not skew the timings). Results are plain JSON so they can
+be stored as a baseline and compared on later runs.
+"""
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from campland.widgets import WIDGETS
+from lands.models import Land
+from lands.synthetic import generate_dataset
+
+
+# Plots and bookings per dataset size
+DATASETS = {
+    'small': (20, 1000),
+    'medium': (200, 20000),
+    'large': (1000, 150000),
+}
+
+# Time and memory may grow by this fraction before a scenario is reported as slower
+DEFAULT_THRESHOLD = 0.25
+
+# Serve static files without a collectstatic manifest, and measure uncached work
+BENCHMARK_SETTINGS = {
+    'STORAGES': {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+    'SEARCH_CACHE_SECONDS': 0,
+    'DASHBOARD_WIDGET_CACHE_SECONDS': {name: 0 for name in WIDGETS},
+}
+
+
+class BenchmarkContext:
+    """Clients and fixtures shared by the scenarios of one dataset"""
+
+    def __init__(self):
+        today = timezone.now().date()
+        self.client = Client()
+        self.admin = Client()
+        self.admin.force_login(User.objects.filter(is_superuser=True).first())
+        self.land = Land.objects.filter(status='available').order_by('pk').first()
+        # Past the generated bookings, so every stay is free
+        self.check_in = today + timedelta(days=400)
+        self.check_out = self.check_in + timedelta(days=2)
+        self.bookings_made = 0
+
+    def dates(self):
+        return {'check_in': self.check_in.isoformat(), 'check_out': self.check_out.isoformat()}
+
+    def next_stay(self):
+        """Dates for a new booking that does not overlap earlier ones"""
+        check_in = self.check_in + timedelta(days=10 + 3 * self.bookings_made)
+        self.bookings_made += 1
+        return {'check_in': check_in.isoformat(), 'check_out': (check_in + timedelta(days=2)).isoformat()}
+
+
+def _search(ctx):
+    return ctx.client.get('/bookings/search/', ctx.dates())
+
+
+def _booking_form(ctx):
+    return ctx.client.get(f'/bookings/book/{ctx.land.pk}/', ctx.dates())
+
+
+def _booking_submit(ctx):
+    query = '&'.join(f'{key}={value}' for key, value in ctx.next_stay().items())
+    return ctx.client.post(f'/bookings/book/{ctx.land.pk}/?{query}', {
+        'first_name': 'Bench',
+        'last_name': 'Mark',
+        'guest_email': 'bench@example.com',
+        'number_of_persons': 1,
+    })
+
+
+def _calendar(ctx):
+    return ctx.client.get(f'/bookings/calendar/{ctx.land.pk}/', {'months': 3})
+
+
+def _admin_index(ctx):
+    return ctx.admin.get('/admin/')
+
+
+def _widget(name):
+    def scenario(ctx):
+        return ctx.admin.get(f'/admin/dashboard/{name}/')
+    return scenario
+
+
+SCENARIOS = {
+    'search_availability': (_search, 200),
+    'booking_form': (_booking_form, 200),
+    'booking_submit': (_booking_submit, 302),
+    'land_availability_calendar': (_calendar, 200),
+    'admin_index': (_admin_index, 200),
+    **{f'admin_widget_{name}': (_widget(name), 200) for name in WIDGETS},
+}
+
+
+def run_scenario(ctx, scenario, expected_status, repeat):
+    """Median wall time, query count and peak memory of one scenario"""
+    cache.clear()
+    response = scenario(ctx)
+    if response.status_code != expected_status:
+        raise AssertionError(f'expected HTTP {expected_status}, got {response.status_code}')
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scenario(ctx)
+        timings.append(time.perf_counter() - started)
+
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        scenario(ctx)
+    query_count = len(queries)
+
+    tracemalloc.start()
+    try:
+        scenario(ctx)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'wall_ms': round(statistics.median(timings) * 1000, 2),
+        'queries': query_count,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def seed_dataset(size, seed=42):
+    """Replace the database contents with the dataset of the given size"""
+    lands, bookings = DATASETS[size]
+    call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+    generate_dataset(lands, bookings, seed=seed)
+    User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+
+
+def run_benchmarks(sizes, scenarios=None, repeat=5, seed=42, log=None):
+    """Seed each dataset size and run the scenarios against it"""
+    results = {}
+    with override_settings(**BENCHMARK_SETTINGS):
+        for size in sizes:
+            if log:
+                log(f'Seeding {size} dataset {DATASETS[size]}...')
+            seed_dataset(size, seed=seed)
+            ctx = BenchmarkContext()
+            results[size] = {}
+            for name in scenarios or SCENARIOS:
+                scenario, expected_status = SCENARIOS[name]
+                results[size][name] = run_scenario(ctx, scenario, expected_status, repeat)
+                if log:
+                    log(f'  {name}: {results[size][name]}')
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare `results` with `baseline`; return (regressions, warnings) as readable strings.
+
+    Query counts are deterministic, so any increase is a regression. Wall
+    time and peak memory depend on the host the baseline was recorded on,
+    so growth beyond `threshold` (a fraction) is only a warning.
+    """
+    regressions = []
+    warnings = []
+    for size, scenarios in results.items():
+        for name, metrics in scenarios.items():
+            reference = baseline.get(size, {}).get(name)
+            if not reference:
+                continue
+            if metrics['queries'] > reference['queries']:
+                regressions.append(
+                    f"{size}/{name}: {metrics['queries']} queries, baseline {reference['queries']}"
+                )
+            for metric in ('wall_ms', 'peak_kb'):
+                limit = reference[metric] * (1 + threshold)
+                if metrics[metric] > limit:
+                    warnings.append(
+                        f'{size}/{name}: {metric} {metrics[metric]}, baseline {reference[metric]} '
+                        f'(limit {limit:.1f})'
+                    )
+    return regressions, warnings
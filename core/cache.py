@@ -0,0 +1,87 @@
+"""
+Page cache for the static core pages.
+
+The home, about and rules pages only change with the date, so the rendered
+page is cached per path under today's date: a new day starts with new keys.
+Pages carrying flash messages are shown to one visitor only, so they are
+always rendered and never stored. base.html caches its header and footer as
+template fragments, which also serves every other page built on it.
+
+warm_page_cache() renders the pages and fragments afresh; run it on deploy
+through the warm_page_cache command. A local-memory cache lives in each
+worker process, so gunicorn warms every worker as it starts instead.
+"""
+from functools import wraps
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.utils import make_template_fragment_key
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+
+# URL names of the pages served through cache_page_daily
+CACHED_PAGES = ['home', 'about', 'rules']
+# {% cache %} fragment names in base.html
+CACHED_FRAGMENTS = ['base_header', 'base_footer']
+
+
+def page_cache_timeout():
+    """Seconds a rendered page stays cached; 0 disables the cache"""
+    return getattr(settings, 'PAGE_CACHE_SECONDS', 3600)
+
+
+def page_cache_key(path):
+    """Cache key for a page, tied to today's date"""
+    return f'core:page:{timezone.now().date().isoformat()}:{path}'
+
+
+def page_cache_is_local():
+    """Check if the cache lives in the memory of each process"""
+    return isinstance(caches['default'], LocMemCache)
+
+
+def has_flash_messages(request):
+    """Check if flash messages are waiting for this visitor, without consuming them"""
+    return bool(len(messages.get_messages(request)))
+
+
+def cache_page_daily(view):
+    """Serve an async page view from the cache for the rest of the day"""
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not page_cache_timeout():
+            return await view(request, *args, **kwargs)
+        if await sync_to_async(has_flash_messages)(request):
+            return await view(request, *args, **kwargs)
+
+        key = page_cache_key(request.path)
+        content = await cache.aget(key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = await view(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(key, response.content, page_cache_timeout())
+        return response
+    return inner
+
+
+def warm_page_cache():
+    """Render the cached pages and fragments afresh into the cache; return the page paths"""
+    for fragment in CACHED_FRAGMENTS:
+        cache.delete(make_template_fragment_key(fragment))
+
+    factory = RequestFactory()
+    paths = []
+    for name in CACHED_PAGES:
+        path = reverse(name)
+        cache.delete(page_cache_key(path))
+        response = async_to_sync(resolve(path).func)(factory.get(path))
+        if response.status_code == 200:
+            paths.append(path)
+    return paths
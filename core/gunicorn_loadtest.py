@@ -0,0 +1,31 @@
+"""
+gunicorn configuration of the load test.
+
+It is gunicorn.conf.py plus an optional delay before every database query
+(LOADTEST_DB_LATENCY_MS), standing in for the network round trip to a
+database server when the load test runs against a local SQLite file.
+"""
+import os
+import runpy
+import time
+from pathlib import Path
+
+
+globals().update(runpy.run_path(str(Path(__file__).resolve().parent.parent / 'gunicorn.conf.py')))
+
+
+def post_fork(server, worker):
+    """Delay every query of this worker by LOADTEST_DB_LATENCY_MS"""
+    latency = float(os.environ.get('LOADTEST_DB_LATENCY_MS', '0')) / 1000
+    if not latency:
+        return
+    from django.db.backends.signals import connection_created
+
+    def delayed(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def add_latency(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delayed)
+
+    connection_created.connect(add_latency, weak=False)
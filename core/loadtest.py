@@ -0,0 +1,180 @@
+"""
+Load test of the sync (WSGI) and async (ASGI) serving modes.
+
+Each mode is started with gunicorn.conf.py and the same number of workers
+against the configured database, then driven by closed-loop clients: every
+client thread sends its next request as soon as the previous one answers,
+cycling through a mix of the public read paths. Each concurrency level runs
+for a fixed time and reports throughput, latency percentiles and errors.
+A mode's capacity is the highest concurrency it served without errors and
+within the p95 latency target.
+"""
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import cycle
+from pathlib import Path
+from django.conf import settings
+from django.utils import timezone
+from lands.models import Land
+
+
+MODES = ['wsgi', 'asgi']
+DEFAULT_CONCURRENCY = [1, 4, 16, 64]
+DEFAULT_TARGET_P95_MS = 1000
+
+
+def default_paths():
+    """Home page, a search and a three-month calendar"""
+    check_in = timezone.localdate() + timedelta(days=30)
+    paths = [
+        '/',
+        f'/bookings/search/?check_in={check_in}&check_out={check_in + timedelta(days=2)}',
+    ]
+    land = Land.objects.filter(status='available').order_by('pk').first()
+    if land is not None:
+        paths.append(f'/bookings/calendar/{land.pk}/?months=3')
+    return paths
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with status {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not listen on port {port} within {timeout} s')
+
+
+@contextmanager
+def serve(mode, workers, db_latency_ms=0):
+    """Run gunicorn in the given serving mode; yields the port it listens on"""
+    port = _free_port()
+    env = {
+        **os.environ,
+        'SERVER_MODE': mode,
+        'WEB_CONCURRENCY': str(workers),
+        'LOADTEST_DB_LATENCY_MS': str(db_latency_ms),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn',
+            '--config', str(Path(__file__).with_name('gunicorn_loadtest.py')),
+            '--bind', f'127.0.0.1:{port}',
+            '--access-logfile', '/dev/null',
+            '--log-level', 'warning',
+        ],
+        cwd=settings.BASE_DIR,
+        env=env,
+    )
+    try:
+        _wait_until_ready(port, process)
+        yield port
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def _client(port, paths, deadline, timeout, latencies, errors, lock):
+    """Send requests back to back until the deadline"""
+    connection = None
+    for path in cycle(paths):
+        if time.monotonic() >= deadline:
+            break
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+            connection.request('GET', path, headers={'Host': 'localhost', 'X-Forwarded-Proto': 'https'})
+            response = connection.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            ok = False
+            connection = None
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors.append(elapsed)
+    if connection is not None:
+        connection.close()
+
+
+def drive(port, paths, concurrency, duration, timeout=30):
+    """Throughput, latency percentiles and errors of one concurrency level"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=_client, args=(port, paths, deadline, timeout, latencies, errors, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = {'requests': len(latencies), 'errors': len(errors), 'rps': round(len(latencies) / elapsed, 1)}
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100)
+        result.update({
+            'p50_ms': round(cuts[49] * 1000, 1),
+            'p95_ms': round(cuts[94] * 1000, 1),
+            'p99_ms': round(cuts[98] * 1000, 1),
+        })
+    return result
+
+
+def capacity(levels, target_p95_ms=DEFAULT_TARGET_P95_MS):
+    """Highest concurrency served without errors within the p95 target"""
+    served = [
+        int(concurrency) for concurrency, result in levels.items()
+        if not result['errors'] and result.get('p95_ms', float('inf')) <= target_p95_ms
+    ]
+    return max(served, default=0)
+
+
+def run_load_test(modes=MODES, concurrency=DEFAULT_CONCURRENCY, duration=10, workers=2,
+                  paths=None, db_latency_ms=0, target_p95_ms=DEFAULT_TARGET_P95_MS, log=None):
+    """Drive each serving mode at each concurrency level"""
+    paths = paths or default_paths()
+    results = {}
+    for mode in modes:
+        if log:
+            log(f'{mode}: {workers} workers')
+        levels = {}
+        with serve(mode, workers, db_latency_ms) as port:
+            # Warm up every worker before measuring
+            drive(port, paths, workers * 2, 2)
+            for level in concurrency:
+                levels[str(level)] = drive(port, paths, level, duration)
+                if log:
+                    log(f'  {level:>4} clients: {levels[str(level)]}')
+        results[mode] = {
+            'workers': workers,
+            'levels': levels,
+            'capacity': capacity(levels, target_p95_ms),
+        }
+    return results
@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from core.sqlitebench import PROFILES, run_sqlite_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Compare read/write throughput of the stock and tuned SQLite profiles under concurrency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+        parser.add_argument('--readers', type=int, default=4, help='Reader processes')
+        parser.add_argument('--writers', type=int, default=2, help='Writer processes')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per profile')
+        parser.add_argument('--lands', type=int, default=100)
+        parser.add_argument('--bookings', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['readers'] < 0 or options['writers'] < 0 or not options['readers'] + options['writers']:
+            raise CommandError('Run at least one reader or writer.')
+
+        results = run_sqlite_benchmark(
+            profiles=options['profiles'],
+            readers=options['readers'],
+            writers=options['writers'],
+            duration=options['duration'],
+            lands=options['lands'],
+            bookings=options['bookings'],
+            seed=options['seed'],
+            log=self.stdout.write
+        )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2) + '\n')
+
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile}: {result['reads_per_second']} reads/s, {result['writes_per_second']} writes/s, "
+                f"{result['read_errors'] + result['write_errors']} locked errors"
+            )
@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from core.loadtest import DEFAULT_CONCURRENCY, DEFAULT_TARGET_P95_MS, MODES, run_load_test
+
+
+class Command(BaseCommand):
+    help = 'Compare the concurrency capacity of the sync (WSGI) and async (ASGI) serving modes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+        parser.add_argument(
+            '--concurrency', nargs='+', type=int, default=DEFAULT_CONCURRENCY,
+            help='Concurrent clients of each run'
+        )
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per concurrency level')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn workers in both modes')
+        parser.add_argument('--path', dest='paths', action='append', help='Request path (repeatable)')
+        parser.add_argument(
+            '--db-latency-ms', type=float, default=0,
+            help='Delay added to every query, standing in for the round trip to a database server'
+        )
+        parser.add_argument(
+            '--target-p95-ms', type=float, default=DEFAULT_TARGET_P95_MS,
+            help='p95 latency a concurrency level must stay within to count towards capacity'
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or min(options['concurrency']) < 1:
+            raise CommandError('--workers and --concurrency must be at least 1.')
+
+        results = run_load_test(
+            modes=options['modes'],
+            concurrency=sorted(options['concurrency']),
+            duration=options['duration'],
+            workers=options['workers'],
+            paths=options['paths'],
+            db_latency_ms=options['db_latency_ms'],
+            target_p95_ms=options['target_p95_ms'],
+            log=self.stdout.write
+        )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2) + '\n')
+
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode}: capacity {result['capacity']} concurrent clients "
+                f"(p95 <= {options['target_p95_ms']:g} ms, no errors)"
+            )
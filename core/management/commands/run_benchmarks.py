@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+from core.benchmarks import DATASETS, DEFAULT_THRESHOLD, SCENARIOS, compare, run_benchmarks
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the booking views and admin dashboard against seeded datasets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', choices=list(DATASETS), default=['small', 'medium'])
+        parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), help='Only run these scenarios')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per scenario')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+        parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline')
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help='Growth of wall time and peak memory reported as a warning, as a fraction'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1.')
+
+        # Run against a throwaway test database, never the configured one, with
+        # DEBUG off so queries are not logged outside the measured requests
+        setup_test_environment(debug=False)
+        # SQLite in memory, as the baseline was recorded: the file-backed test
+        # database of the test suite adds a disk sync to every write
+        if connections['default'].vendor == 'sqlite':
+            connections['default'].settings_dict['TEST']['NAME'] = None
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            results = run_benchmarks(
+                options['sizes'],
+                scenarios=options['scenarios'],
+                repeat=options['repeat'],
+                seed=options['seed'],
+                log=self.stdout.write
+            )
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2) + '\n')
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+            for size, scenarios in results.items():
+                baseline.setdefault(size, {}).update(scenarios)
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'✓ Baseline saved to {baseline_path}'))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'⚠ No baseline at {baseline_path}; nothing to compare'))
+            return
+
+        regressions, warnings = compare(results, json.loads(baseline_path.read_text()), options['threshold'])
+        # Timings vary between hosts, so only query counts fail the run
+        for warning in warnings:
+            self.stdout.write(self.style.WARNING(f'⚠ {warning}'))
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(self.style.ERROR(f'✗ {regression}'))
+            raise CommandError(f'{len(regressions)} benchmark regressions')
+        self.stdout.write(self.style.SUCCESS('✓ No regressions against the baseline'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from core.cache import CACHED_FRAGMENTS, page_cache_is_local, page_cache_timeout, warm_page_cache
+
+
+class Command(BaseCommand):
+    help = "Render the cached core pages and base.html fragments into the cache (run on deploy)"
+
+    def handle(self, *args, **options):
+        if page_cache_is_local():
+            self.stdout.write(self.style.WARNING(
+                'The cache is local to each process, so this only warms this one; '
+                'gunicorn workers warm their own cache as they start.'
+            ))
+        if not page_cache_timeout():
+            self.stdout.write('PAGE_CACHE_SECONDS is 0: only the template fragments are cached.')
+
+        paths = warm_page_cache()
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {len(paths)} pages ({', '.join(paths)}) and {len(CACHED_FRAGMENTS)} fragments"
+        ))
@@ -0,0 +1,213 @@
+"""
+Concurrency benchmark of the SQLite profiles.
+
+A synthetic dataset is generated once into a template SQLite file. For each
+profile (the stock settings, then SQLITE_TUNED) a copy of the template is
+hammered by separate reader and writer processes, as gunicorn workers
+would: readers run the availability search and a plot calendar query,
+writers book random future stays through create_booking. Every process
+reports its operation counts, write latencies and "database is locked"
+errors; the totals give read and write throughput per profile. Workers
+start up and warm up before a common start time, so process start-up on a
+busy host does not count as lock waits.
+
+Worker processes are started as `python -m core.sqlitebench <role> ...` so
+each one loads the settings for its profile from the environment.
+"""
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+
+PROFILES = {
+    'default': {'SQLITE_TUNED': 'False'},
+    'tuned': {'SQLITE_TUNED': 'True'},
+}
+
+# Time allowed per worker process to start and warm up before measuring
+STARTUP_SECONDS = 1.5
+
+
+def _env(database, profile):
+    return {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'campland.settings',
+        'DATABASE_URL': f'sqlite:///{database}',
+        # Persistent connections, as under gunicorn
+        'DB_CONN_MAX_AGE': '600',
+        **PROFILES[profile],
+    }
+
+
+def _run_role(role, database, profile, *args):
+    base_dir = Path(__file__).resolve().parent.parent
+    return subprocess.Popen(
+        [sys.executable, '-m', 'core.sqlitebench', role, *map(str, args)],
+        cwd=base_dir,
+        env=_env(database, profile),
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+
+
+def prepare_template(path, lands, bookings, seed):
+    """Migrate a new SQLite file and fill it with a synthetic dataset"""
+    process = _run_role('setup', path, 'default', lands, bookings, seed)
+    process.communicate()
+    if process.returncode:
+        raise RuntimeError('Creating the benchmark database failed')
+
+
+def run_profile(template, profile, readers, writers, duration, seed):
+    """Totals of one profile: operations per second, locked errors, write latency"""
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(directory) / 'bench.sqlite3'
+        shutil.copy(template, database)
+        start_at = time.time() + STARTUP_SECONDS * (readers + writers)
+        processes = [
+            _run_role('read', database, profile, start_at, duration, seed + index)
+            for index in range(readers)
+        ] + [
+            _run_role('write', database, profile, start_at, duration, seed + readers + index)
+            for index in range(writers)
+        ]
+        reports = []
+        for process in processes:
+            output, _ = process.communicate()
+            if process.returncode:
+                raise RuntimeError(f'A {profile} benchmark worker failed')
+            reports.append(json.loads(output.strip().splitlines()[-1]))
+
+    reads = [report for report in reports if report['role'] == 'read']
+    writes = [report for report in reports if report['role'] == 'write']
+    latencies = sorted(latency for report in writes for latency in report['latencies'])
+    result = {
+        'reads_per_second': round(sum(report['done'] for report in reads) / duration, 1),
+        'writes_per_second': round(sum(report['done'] for report in writes) / duration, 1),
+        'read_errors': sum(report['locked'] for report in reads),
+        'write_errors': sum(report['locked'] for report in writes),
+        'write_conflicts': sum(report['conflicts'] for report in writes),
+    }
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100)
+        result['write_p50_ms'] = round(cuts[49] * 1000, 1)
+        result['write_p95_ms'] = round(cuts[94] * 1000, 1)
+    return result
+
+
+def run_sqlite_benchmark(profiles=tuple(PROFILES), readers=4, writers=2, duration=10,
+                         lands=100, bookings=20000, seed=42, log=None):
+    """Prepare the dataset once and run every profile against a copy of it"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        template = Path(directory) / 'template.sqlite3'
+        if log:
+            log(f'Seeding {lands} plots and {bookings} bookings...')
+        prepare_template(template, lands, bookings, seed)
+        for profile in profiles:
+            results[profile] = run_profile(template, profile, readers, writers, duration, seed)
+            if log:
+                log(f'  {profile}: {results[profile]}')
+    return results
+
+
+# Worker processes
+
+def _setup(lands, bookings, seed):
+    from django.core.management import call_command
+    from lands.synthetic import generate_dataset
+    call_command('migrate', verbosity=0)
+    generate_dataset(int(lands), int(bookings), seed=int(seed))
+    return {'role': 'setup'}
+
+
+def _wait_for(start_at):
+    time.sleep(max(float(start_at) - time.time(), 0))
+    return time.monotonic()
+
+
+def _read(start_at, duration, seed):
+    from django.db import OperationalError
+    from django.utils import timezone
+    from bookings.availability import overlapping_bookings, split_lands_by_availability
+    from lands.models import Land
+
+    rng = random.Random(int(seed))
+    land_ids = list(Land.objects.values_list('pk', flat=True))
+    today = timezone.localdate()
+    split_lands_by_availability(today, today + timedelta(days=1))
+    done = locked = 0
+    deadline = _wait_for(start_at) + float(duration)
+    while time.monotonic() < deadline:
+        check_in = today + timedelta(days=rng.randint(0, 180))
+        try:
+            split_lands_by_availability(check_in, check_in + timedelta(days=rng.randint(1, 7)))
+            list(overlapping_bookings(check_in, check_in + timedelta(days=90)).filter(
+                land_id=rng.choice(land_ids)
+            ).values_list('check_in', 'check_out'))
+            done += 1
+        except OperationalError:
+            locked += 1
+    return {'role': 'read', 'done': done, 'locked': locked}
+
+
+def _write(start_at, duration, seed):
+    from decimal import Decimal
+    from django.db import OperationalError
+    from django.utils import timezone
+    from bookings.availability import split_lands_by_availability
+    from bookings.reservations import BookingUnavailable, create_booking
+    from lands.models import Land
+
+    rng = random.Random(int(seed))
+    lands = list(Land.objects.filter(status='available'))
+    # Past the generated bookings, so most stays are free
+    first_day = timezone.localdate() + timedelta(days=400)
+    split_lands_by_availability(first_day, first_day + timedelta(days=1))
+    done = locked = conflicts = 0
+    latencies = []
+    deadline = _wait_for(start_at) + float(duration)
+    while time.monotonic() < deadline:
+        land = rng.choice(lands)
+        check_in = first_day + timedelta(days=rng.randint(0, 3650))
+        started = time.perf_counter()
+        try:
+            create_booking(
+                land,
+                check_in,
+                check_in + timedelta(days=rng.randint(1, 5)),
+                guest_name='Bench Mark',
+                guest_email='bench@example.com',
+                guest_phone='',
+                number_of_guests=1,
+                price_per_night=land.price_per_night or Decimal('50.00'),
+                status='pending',
+            )
+            done += 1
+            latencies.append(time.perf_counter() - started)
+        except BookingUnavailable as e:
+            if isinstance(e.__cause__, OperationalError):
+                locked += 1
+            else:
+                conflicts += 1
+        except OperationalError:
+            # Locked outside the booking transaction (statistics rollups)
+            locked += 1
+    return {'role': 'write', 'done': done, 'locked': locked, 'conflicts': conflicts, 'latencies': latencies}
+
+
+ROLES = {'setup': _setup, 'read': _read, 'write': _write}
+
+
+if __name__ == '__main__':
+    import django
+    django.setup()
+    print(json.dumps(ROLES[sys.argv[1]](*sys.argv[2:])))
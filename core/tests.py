@@ -1,3 +1,77 @@
-from django.test import TestCase
+from io import StringIO
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from campland.testing import TEST_STORAGES
+from .benchmarks import compare
+from .cache import CACHED_FRAGMENTS, page_cache_key
+
+
+class BenchmarkCompareTests(SimpleTestCase):
+    """Benchmark results are checked against the stored baseline"""
+
+    baseline = {
+        'small': {
+            'search_availability': {'wall_ms': 10.0, 'queries': 4, 'peak_kb': 500.0},
+        },
+    }
+
+    def result(self, **metrics):
+        values = {'wall_ms': 10.0, 'queries': 4, 'peak_kb': 500.0, **metrics}
+        return {'small': {'search_availability': values}}
+
+    def test_within_threshold(self):
+        self.assertEqual(compare(self.result(wall_ms=12.4, peak_kb=600.0), self.baseline, 0.25), ([], []))
+
+    def test_slower_beyond_threshold_is_only_a_warning(self):
+        regressions, warnings = compare(self.result(wall_ms=12.6), self.baseline, 0.25)
+        self.assertEqual(regressions, [])
+        self.assertEqual(len(warnings), 1)
+        self.assertIn('wall_ms', warnings[0])
+
+    def test_any_extra_query_is_a_regression(self):
+        regressions, warnings = compare(self.result(queries=5), self.baseline, 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('queries', regressions[0])
+        self.assertEqual(warnings, [])
+
+    def test_new_scenarios_are_skipped(self):
+        results = {'large': {'search_availability': {'wall_ms': 1e6, 'queries': 99, 'peak_kb': 1e6}}}
+        self.assertEqual(compare(results, self.baseline), ([], []))
+
+
+@override_settings(STORAGES=TEST_STORAGES, PAGE_CACHE_SECONDS=3600)
+class PageCacheTests(TestCase):
+    """The core pages are cached per day, except while flash messages are pending"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_second_visit_is_served_from_cache(self):
+        first = self.client.get('/about/')
+        self.assertTemplateUsed(first, 'about.html')
+        self.assertEqual(cache.get(page_cache_key('/about/')), first.content)
+
+        second = self.client.get('/about/')
+        self.assertTemplateNotUsed(second, 'about.html')
+        self.assertEqual(second.content, first.content)
+
+    def test_pages_with_flash_messages_are_not_cached(self):
+        cached = self.client.get('/').content
+        self.client.post('/contact/', {'name': 'Camper', 'email': 'camper@example.com'})
+
+        with_message = self.client.get('/')
+        self.assertTemplateUsed(with_message, 'home.html')
+        self.assertContains(with_message, 'Thank you Camper')
+        self.assertEqual(cache.get(page_cache_key('/')), cached)
+        self.assertEqual(self.client.get('/').content, cached)
+
+    def test_warm_command_fills_pages_and_fragments(self):
+        call_command('warm_page_cache', stdout=StringIO())
+
+        for path in ('/', '/about/', '/rules/'):
+            self.assertIsNotNone(cache.get(page_cache_key(path)), path)
+        for fragment in CACHED_FRAGMENTS:
+            self.assertIsNotNone(cache.get(make_template_fragment_key(fragment)), fragment)
 
-# Create your tests here.
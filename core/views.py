@@ -1,24 +1,29 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.utils import timezone
+from campland.asyncviews import arender
+from .cache import cache_page_daily
 
 
-def home(request):
+@cache_page_daily
+async def home(request):
     """Home page view"""
     context = {
         'today': timezone.now().date()
     }
-    return render(request, 'home.html', context)
+    return await arender(request, 'home.html', context)
 
 
-def about(request):
+@cache_page_daily
+async def about(request):
     """About page view"""
-    return render(request, 'about.html')
+    return await arender(request, 'about.html')
 
 
-def rules(request):
+@cache_page_daily
+async def rules(request):
     """Rules page view"""
-    return render(request, 'rules.html')
+    return await arender(request, 'rules.html')
 
 
 def contact(request):
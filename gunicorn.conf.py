@@ -5,9 +5,16 @@ import os
 bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
 backlog = 2048
 
+# Serving mode: "wsgi" runs sync workers, one request at a time each;
+# "asgi" runs uvicorn workers that serve the async views concurrently
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+
 # Worker processes
-workers = 2
-worker_class = "sync"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+worker_class = "uvicorn_worker.UvicornWorker" if server_mode == "asgi" else "sync"
+# More than one thread turns sync workers into gthread workers; the database
+# pool of each worker is sized from this (see DB_POOL_MAX_SIZE in settings)
+threads = int(os.environ.get('WEB_THREADS', '1'))
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -24,5 +31,21 @@ errorlog = "-"
 # Process naming
 proc_name = "campland"
 
-# Django WSGI module and variable name
-wsgi_module = "campland.wsgi:application"
\ No newline at end of file
+# Django application for the serving mode
+wsgi_app = "campland.asgi:application" if server_mode == "asgi" else "campland.wsgi:application"
+
+
+def on_starting(server):
+    """Clear request metrics left by a previous run of the server"""
+    metrics_dir = os.environ.get('REQUEST_METRICS_DIR')
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            if name.startswith('metrics-') and name.endswith('.json'):
+                os.remove(os.path.join(metrics_dir, name))
+
+
+def post_worker_init(worker):
+    """Warm the page cache of each worker when it is kept in process memory"""
+    from core.cache import page_cache_is_local, warm_page_cache
+    if page_cache_is_local():
+        warm_page_cache()
@@ -1,6 +1,8 @@
-from django.core.management.base import BaseCommand
+import time
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from lands.models import Land
+from lands.synthetic import generate_dataset
 from bookings.models import PriceSetting
 from decimal import Decimal
 
@@ -8,7 +10,16 @@ from decimal import Decimal
 class Command(BaseCommand):
     help = 'Populate database with sample camping plots and pricing'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--lands', type=int, help='Scale mode: number of synthetic plots to generate')
+        parser.add_argument('--bookings', type=int, default=0, help='Scale mode: number of bookings to generate')
+        parser.add_argument('--seed', type=int, default=42, help='Scale mode: random seed')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Scale mode: rows per bulk insert')
+
     def handle(self, *args, **kwargs):
+        if kwargs['lands'] is not None:
+            return self.handle_scale(**kwargs)
+        
         self.stdout.write('Creating sample data...\n')
         
         # Create price setting
@@ -124,3 +135,22 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'\n✓ Created {created_count} new camping plots'))
         self.stdout.write(self.style.SUCCESS(f'✓ Total camping plots in database: {Land.objects.count()}'))
         self.stdout.write(self.style.SUCCESS('\n✓ Sample data creation complete!'))
+    
+    def handle_scale(self, **kwargs):
+        """Generate synthetic plots with seasonal, non-overlapping booking histories"""
+        if kwargs['lands'] < 1 or kwargs['bookings'] < 0 or kwargs['batch_size'] < 1:
+            raise CommandError('--lands and --batch-size must be positive and --bookings not negative.')
+        
+        self.stdout.write(
+            f"Generating {kwargs['lands']} plots and {kwargs['bookings']} bookings (seed {kwargs['seed']})...\n"
+        )
+        started = time.monotonic()
+        lands, bookings = generate_dataset(
+            kwargs['lands'],
+            kwargs['bookings'],
+            seed=kwargs['seed'],
+            batch_size=kwargs['batch_size'],
+            log=self.stdout.write
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'\n✓ Created {lands} plots and {bookings} bookings in {elapsed:.1f}s'))
@@ -0,0 +1,212 @@
+"""
+Synthetic plots and booking histories for capacity planning and benchmarks.
+
+Everything is drawn from one random.Random(seed), so the same arguments on
+the same day produce the same rows. Rows are written with batched
+bulk_create calls, one transaction per batch, and only one batch of
+bookings is held in memory at a time.
+"""
+import math
+import random
+from bisect import bisect_left
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from django.db import transaction
+from django.utils import timezone
+from bookings import occupancy_index
+from bookings.models import Booking
+from bookings.rollups import rebuild_stats
+from .models import Land
+
+
+FIRST_NAMES = [
+    'Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Jamie', 'Riley', 'Avery', 'Quinn',
+    'Charlie', 'Robin', 'Drew', 'Emery', 'Rowan', 'Sage', 'Parker', 'Reese', 'Skyler', 'Dakota',
+]
+LAST_NAMES = [
+    'Martin', 'Tremblay', 'Roy', 'Gagnon', 'Bouchard', 'Smith', 'Brown', 'Wilson', 'Lee', 'Nguyen',
+    'Garcia', 'Cote', 'Pelletier', 'Morin', 'Lavoie', 'Fortin', 'Walker', 'Clark', 'Lewis', 'Young',
+]
+AMENITIES = [
+    'Electricity', 'Water', 'Fire Pit', 'Picnic Table', 'BBQ Grill', 'Sewer Hookup',
+    'Lake Access', 'Shade Trees', 'Wi-Fi', 'Large Parking',
+]
+PLOT_NAME_PREFIX = 'Synthetic Plot'
+
+# Stay lengths in nights and their relative frequency
+STAY_LENGTHS = [1, 2, 3, 4, 5, 6, 7, 10, 14]
+STAY_WEIGHTS = [10, 26, 22, 14, 9, 5, 8, 4, 2]
+AVERAGE_STAY = sum(n * w for n, w in zip(STAY_LENGTHS, STAY_WEIGHTS)) / sum(STAY_WEIGHTS)
+
+# Share of nights booked that the generated history aims for
+TARGET_OCCUPANCY = 0.55
+# Nights of future bookings generated beyond today
+FUTURE_DAYS = 180
+# Rows per UPDATE when writing back created_at
+UPDATE_BATCH_SIZE = 500
+
+
+def seasonal_demand(day):
+    """Relative demand for a night: peaks mid-July, busier on weekends"""
+    season = 1 + 0.8 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 196) / 365)
+    weekend = 1.4 if day.weekday() in (4, 5) else 1.0
+    return season * weekend
+
+
+def _write_batch(model, rows, batch_size):
+    with transaction.atomic():
+        return model.objects.bulk_create(rows, batch_size=batch_size)
+
+
+def _write_bookings(bookings, batch_size):
+    """
+    Insert bookings with the created_at values drawn for them.
+
+    created_at is auto_now_add, which bulk_create applies to every row, so
+    the drawn values are written back in the same transaction.
+    """
+    drawn = [booking.created_at for booking in bookings]
+    with transaction.atomic():
+        bookings = Booking.objects.bulk_create(bookings, batch_size=batch_size)
+        for booking, created_at in zip(bookings, drawn):
+            booking.created_at = created_at
+        # Small batches keep the CASE expression of each UPDATE short
+        Booking.objects.bulk_update(bookings, ['created_at'], batch_size=UPDATE_BATCH_SIZE)
+
+
+def generate_lands(rng, count, batch_size=1000):
+    """Create `count` synthetic plots and return them with primary keys set"""
+    offset = Land.objects.filter(name__startswith=PLOT_NAME_PREFIX).count()
+    lands = []
+    batch = []
+    for i in range(offset + 1, offset + count + 1):
+        batch.append(Land(
+            name=f'{PLOT_NAME_PREFIX} {i:05d}',
+            description='Generated plot for capacity planning.',
+            size=Decimal(rng.randrange(80, 250)),
+            capacity=rng.randint(2, 10),
+            amenities=', '.join(rng.sample(AMENITIES, rng.randint(2, 6))),
+            price_per_night=Decimal(rng.randrange(35, 100, 5)),
+            status='maintenance' if rng.random() < 0.02 else 'available',
+        ))
+        if len(batch) >= batch_size:
+            lands.extend(_write_batch(Land, batch, batch_size))
+            batch = []
+    if batch:
+        lands.extend(_write_batch(Land, batch, batch_size))
+    return lands
+
+
+def _booking_status(rng, check_in, check_out, today):
+    roll = rng.random()
+    if check_out <= today:
+        return 'cancelled' if roll < 0.12 else 'completed'
+    if check_in <= today:
+        return 'confirmed'
+    if roll < 0.1:
+        return 'cancelled'
+    return 'pending' if roll < 0.3 else 'confirmed'
+
+
+def land_history(rng, land, count, start, cumulative, today):
+    """
+    Non-overlapping stays for one plot.
+
+    Arrival days are drawn from the seasonal demand curve (`cumulative`
+    weights over the days from `start`), sorted, and each stay is pushed
+    past the previous check-out, so busy seasons pack tightly. A plot under
+    maintenance only gets stays that ended by today.
+    """
+    if land.status == 'maintenance':
+        cumulative = cumulative[:(today - start).days]
+    total = cumulative[-1]
+    arrivals = sorted(bisect_left(cumulative, rng.random() * total) for _ in range(count))
+    free_from = 0
+    for offset in arrivals:
+        offset = max(offset, free_from)
+        nights = rng.choices(STAY_LENGTHS, STAY_WEIGHTS)[0]
+        check_in = start + timedelta(days=offset)
+        check_out = check_in + timedelta(days=nights)
+        free_from = offset + nights
+        if land.status == 'maintenance' and check_out > today:
+            # Later arrivals only land further out
+            return
+
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        # Future stays were booked before today
+        lead_days = max((check_in - today).days, 0) + rng.randint(0, 120)
+        created = datetime.combine(check_in - timedelta(days=lead_days), time(rng.randint(7, 22), rng.randint(0, 59)))
+        # Keep the output reproducible during the day: nothing is created after midnight
+        created = min(created, datetime.combine(today, time.min))
+        booking = Booking(
+            land_id=land.pk,
+            guest_name=f'{first_name} {last_name}',
+            guest_email=f'{first_name}.{last_name}{rng.randint(1, 9999)}@example.com'.lower(),
+            guest_phone=f'555-{rng.randint(0, 9999):04d}',
+            number_of_guests=rng.randint(1, land.capacity),
+            check_in=check_in,
+            check_out=check_out,
+            price_per_night=land.price_per_night,
+            status=_booking_status(rng, check_in, check_out, today),
+            created_at=timezone.make_aware(created),
+        )
+        booking.calculate_totals()
+        yield booking
+
+
+def generate_bookings(rng, lands, count, today, batch_size=5000, log=None):
+    """
+    Create about `count` bookings spread over `lands`.
+
+    The history window is sized so stays fill roughly TARGET_OCCUPANCY of
+    the nights, and ends FUTURE_DAYS after today. Plots under maintenance
+    get no current or future stays, so a few bookings fall short of `count`.
+    """
+    if not lands or not count:
+        return 0
+    per_land = count / len(lands)
+    window_days = max(365, math.ceil(per_land * AVERAGE_STAY / TARGET_OCCUPANCY))
+    end = today + timedelta(days=FUTURE_DAYS)
+    start = end - timedelta(days=window_days)
+    cumulative = list(accumulate(seasonal_demand(start + timedelta(days=i)) for i in range(window_days)))
+
+    created = 0
+    batch = []
+    for index, land in enumerate(lands):
+        # Spread the remainder so the plots share `count` exactly
+        land_count = int((index + 1) * per_land) - int(index * per_land)
+        batch.extend(land_history(rng, land, land_count, start, cumulative, today))
+        if len(batch) >= batch_size:
+            _write_bookings(batch, batch_size)
+            created += len(batch)
+            batch = []
+            if log:
+                log(f'  {created} bookings')
+    if batch:
+        _write_bookings(batch, batch_size)
+        created += len(batch)
+    return created
+
+
+def generate_dataset(lands, bookings, seed=42, batch_size=5000, log=None):
+    """
+    Generate plots and booking histories, then rebuild the derived data.
+
+    bulk_create bypasses the Booking signals, so the statistics rollups are
+    rebuilt and the occupancy index invalidated once at the end.
+    """
+    rng = random.Random(seed)
+    today = timezone.localdate()
+
+    new_lands = generate_lands(rng, lands, batch_size=min(batch_size, 1000))
+    if log:
+        log(f'Created {len(new_lands)} plots')
+    created = generate_bookings(rng, new_lands, bookings, today, batch_size=batch_size, log=log)
+    if log:
+        log(f'Created {created} bookings; rebuilding statistics')
+
+    rebuild_stats(batch_days=90)
+    occupancy_index.invalidate()
+    return len(new_lands), created
@@ -1,3 +1,56 @@
+import random
+from datetime import date, datetime, time
+from decimal import Decimal
 from django.test import TestCase
+from django.utils import timezone
+from bookings.models import Booking
+from .models import Land
+from .synthetic import generate_bookings, generate_dataset
 
-# Create your tests here.
+
+class SyntheticDataTests(TestCase):
+    """Generated booking histories for capacity planning"""
+
+    def booking_rows(self):
+        return list(Booking.objects.order_by('land__name', 'check_in').values_list(
+            'land__name', 'guest_name', 'guest_email', 'number_of_guests',
+            'check_in', 'check_out', 'status', 'total_price', 'created_at',
+        ))
+
+    def test_stays_on_a_plot_never_overlap(self):
+        generate_dataset(lands=10, bookings=600, seed=3)
+
+        for land in Land.objects.all():
+            stays = list(land.bookings.order_by('check_in').values_list('check_in', 'check_out'))
+            for (_, previous_out), (check_in, _) in zip(stays, stays[1:]):
+                self.assertGreaterEqual(check_in, previous_out, land.name)
+
+    def test_same_seed_gives_identical_rows(self):
+        generate_dataset(lands=5, bookings=200, seed=11)
+        first = self.booking_rows()
+        Booking.objects.all().delete()
+        Land.objects.all().delete()
+
+        generate_dataset(lands=5, bookings=200, seed=11)
+
+        self.assertEqual(self.booking_rows(), first)
+
+    def test_bookings_keep_their_drawn_creation_times(self):
+        generate_dataset(lands=3, bookings=60, seed=2)
+
+        # Nothing is drawn after today's midnight, unlike an auto_now_add timestamp
+        midnight = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        self.assertFalse(Booking.objects.filter(created_at__gt=midnight).exists())
+        self.assertTrue(Booking._meta.get_field('created_at').auto_now_add)
+
+    def test_plots_under_maintenance_get_no_future_stays(self):
+        today = date(2026, 7, 15)
+        land = Land.objects.create(
+            name='Closed Plot', description='Closed for works.', size=Decimal('100'), capacity=4,
+            price_per_night=Decimal('50'), status='maintenance',
+        )
+
+        generate_bookings(random.Random(5), [land], 300, today)
+
+        self.assertTrue(land.bookings.exists())
+        self.assertFalse(land.bookings.filter(check_out__gt=today).exists())
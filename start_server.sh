@@ -4,11 +4,28 @@
 echo "Starting CampLand Django application..."
 echo "Django settings module: $DJANGO_SETTINGS_MODULE"
 echo "Debug mode: $DEBUG"
+echo "Server mode: ${SERVER_MODE:-wsgi}"
+
+# SERVER_MODE=asgi serves the async views with uvicorn workers
+if [ "$SERVER_MODE" = "asgi" ]; then
+    APP=campland.asgi:application
+    WORKER_CLASS=uvicorn_worker.UvicornWorker
+else
+    APP=campland.wsgi:application
+    WORKER_CLASS=sync
+fi
+
+# Warm the shared page cache; a per-process cache is warmed by each worker
+if [ -n "$CACHE_LOCATION" ]; then
+    python manage.py warm_page_cache
+fi
 
 # Start the application with gunicorn
-exec gunicorn campland.wsgi:application \
+exec gunicorn $APP \
+    --worker-class $WORKER_CLASS \
     --bind 0.0.0.0:${PORT:-8000} \
-    --workers 2 \
+    --workers ${WEB_CONCURRENCY:-2} \
+    --threads ${WEB_THREADS:-1} \
     --timeout 30 \
     --log-level info \
     --access-logfile - \